@@ -0,0 +1,46 @@
+"""add_broadcast_jobs
+
+Revision ID: 3b7e9f0a1c48
+Revises: f19c7a4e2b60
+Create Date: 2026-10-17 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9f0a1c48'
+down_revision: Union[str, Sequence[str], None] = 'f19c7a4e2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('broadcast_jobs',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('admin_chat_id', sa.BigInteger(), nullable=False),
+    sa.Column('progress_message_id', sa.Integer(), nullable=True),
+    sa.Column('content_type', sa.String(), nullable=False),
+    sa.Column('message_text', sa.String(), nullable=True),
+    sa.Column('file_id', sa.String(), nullable=True),
+    sa.Column('from_chat_id', sa.BigInteger(), nullable=True),
+    sa.Column('source_message_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False, server_default='running'),
+    sa.Column('cursor', sa.BigInteger(), nullable=True),
+    sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('sent_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('failed_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('lease_until', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_broadcast_jobs_running', 'broadcast_jobs', ['lease_until'], unique=False, postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_broadcast_jobs_running', table_name='broadcast_jobs', postgresql_where=sa.text("status = 'running'"))
+    op.drop_table('broadcast_jobs')
@@ -0,0 +1,27 @@
+"""add_fresh_connection
+
+Revision ID: 3b9e1f7a2c41
+Revises: 61c2df339bc7
+Create Date: 2026-10-17 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1f7a2c41'
+down_revision: Union[str, Sequence[str], None] = '61c2df339bc7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Monitors that want cold (no keep-alive) latency measurements
+    op.add_column('monitors', sa.Column('fresh_connection', sa.Boolean(), nullable=False, server_default='false'))
+
+
+def downgrade() -> None:
+    op.drop_column('monitors', 'fresh_connection')
@@ -0,0 +1,34 @@
+"""add_scheduler_nodes
+
+Revision ID: 6e3a0c9d7f12
+Revises: b41d09e7c5f2
+Create Date: 2026-10-17 11:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e3a0c9d7f12'
+down_revision: Union[str, Sequence[str], None] = 'b41d09e7c5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduler_nodes',
+    sa.Column('node_id', sa.String(), nullable=False),
+    sa.Column('hostname', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('node_id')
+    )
+    op.create_index(op.f('ix_scheduler_nodes_heartbeat_at'), 'scheduler_nodes', ['heartbeat_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scheduler_nodes_heartbeat_at'), table_name='scheduler_nodes')
+    op.drop_table('scheduler_nodes')
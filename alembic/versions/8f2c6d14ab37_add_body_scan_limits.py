@@ -0,0 +1,28 @@
+"""add_body_scan_limits
+
+Revision ID: 8f2c6d14ab37
+Revises: 3b9e1f7a2c41
+Create Date: 2026-10-17 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c6d14ab37'
+down_revision: Union[str, Sequence[str], None] = '3b9e1f7a2c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('monitors', sa.Column('max_body_bytes', sa.Integer(), nullable=True))
+    op.add_column('checks', sa.Column('bytes_read', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('checks', 'bytes_read')
+    op.drop_column('monitors', 'max_body_bytes')
@@ -0,0 +1,33 @@
+"""add_next_check_at
+
+Revision ID: 9a7d2e5b1c03
+Revises: 6e3a0c9d7f12
+Create Date: 2026-10-17 12:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7d2e5b1c03'
+down_revision: Union[str, Sequence[str], None] = '6e3a0c9d7f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('monitors', sa.Column('next_check_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    # Existing monitors continue from their last check; never-checked ones are due now
+    op.execute(
+        "UPDATE monitors SET next_check_at = "
+        "COALESCE(last_checked + make_interval(secs => interval_seconds), now())"
+    )
+    op.create_index('ix_monitors_next_check_at', 'monitors', ['next_check_at'], unique=False, postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_monitors_next_check_at', table_name='monitors', postgresql_where=sa.text('is_active'))
+    op.drop_column('monitors', 'next_check_at')
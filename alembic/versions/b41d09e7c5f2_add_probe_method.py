@@ -0,0 +1,27 @@
+"""add_probe_method
+
+Revision ID: b41d09e7c5f2
+Revises: 8f2c6d14ab37
+Create Date: 2026-10-17 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d09e7c5f2'
+down_revision: Union[str, Sequence[str], None] = '8f2c6d14ab37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # AUTO lets the scheduler pick the cheapest probe that can evaluate the monitor's rules
+    op.add_column('monitors', sa.Column('probe_method', sa.String(), nullable=False, server_default='AUTO'))
+
+
+def downgrade() -> None:
+    op.drop_column('monitors', 'probe_method')
@@ -0,0 +1,34 @@
+"""add_check_phase_timings
+
+Revision ID: c28f4b6a9e15
+Revises: 9a7d2e5b1c03
+Create Date: 2026-10-17 12:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c28f4b6a9e15'
+down_revision: Union[str, Sequence[str], None] = '9a7d2e5b1c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('checks', sa.Column('dns_time', sa.Float(), nullable=True))
+    op.add_column('checks', sa.Column('connect_time', sa.Float(), nullable=True))
+    op.add_column('checks', sa.Column('tls_time', sa.Float(), nullable=True))
+    op.add_column('checks', sa.Column('ttfb', sa.Float(), nullable=True))
+    op.add_column('checks', sa.Column('transfer_time', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('checks', 'transfer_time')
+    op.drop_column('checks', 'ttfb')
+    op.drop_column('checks', 'tls_time')
+    op.drop_column('checks', 'connect_time')
+    op.drop_column('checks', 'dns_time')
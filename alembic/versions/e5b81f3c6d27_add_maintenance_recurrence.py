@@ -0,0 +1,27 @@
+"""add_maintenance_recurrence
+
+Revision ID: e5b81f3c6d27
+Revises: c28f4b6a9e15
+Create Date: 2026-10-17 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b81f3c6d27'
+down_revision: Union[str, Sequence[str], None] = 'c28f4b6a9e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL keeps existing windows one-off
+    op.add_column('maintenance_windows', sa.Column('recurrence', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('maintenance_windows', 'recurrence')
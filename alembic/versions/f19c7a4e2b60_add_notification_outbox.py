@@ -0,0 +1,48 @@
+"""add_notification_outbox
+
+Revision ID: f19c7a4e2b60
+Revises: e5b81f3c6d27
+Create Date: 2026-10-17 14:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19c7a4e2b60'
+down_revision: Union[str, Sequence[str], None] = 'e5b81f3c6d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('idempotency_key', sa.String(), nullable=False),
+    sa.Column('monitor_id', sa.Uuid(), nullable=False),
+    sa.Column('previous_status', sa.Boolean(), nullable=True),
+    sa.Column('current_status', sa.Boolean(), nullable=False),
+    sa.Column('error_details', sa.String(), nullable=True),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('delivered_channels', sa.String(), nullable=False, server_default=''),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['monitor_id'], ['monitors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index(op.f('ix_notification_outbox_monitor_id'), 'notification_outbox', ['monitor_id'], unique=False)
+    op.create_index('ix_notification_outbox_due', 'notification_outbox', ['next_attempt_at'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_outbox_due', table_name='notification_outbox', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_index(op.f('ix_notification_outbox_monitor_id'), table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -1,36 +1,73 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import asyncio
 from app.database.init_db import init_db
 from app.routers import checks, monitors, users
-from app.services.scheduler import start_scheduler
+from app.services.watchdog import watchdog
+from app.services.health import health_report
+from app.services.http_client import probe_pool
+from app.services.result_writer import result_writer
+from app.services.notification_outbox import notification_outbox
+from app.bot.sender import telegram_sender
+from app.services.email_service import mailer
+from app.services.broadcast_service import broadcast_runner
+from app.services.metrics import registry, watch_event_loop_lag
 from app.bot.main import start_bot
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+
+    # Start the batched check result writer before anything can produce results
+    result_writer.start()
+
+    # Paces every outgoing bot message to Telegram's rate limits
+    telegram_sender.start()
+
+    # Deliver queued notifications independently of the check path
+    notification_outbox.start()
+
+    # Start or resume admin broadcasts
+    broadcast_runner.start()
     
-    # Start the scheduler in the background
-    scheduler_task = asyncio.create_task(start_scheduler())
+    # Start the scheduler in the background, supervised by a watchdog that restarts it if it dies or stalls
+    watchdog.start()
     
     # Start the bot in the background
     bot_task = asyncio.create_task(start_bot())
 
+    # Measures how saturated the shared event loop is
+    loop_lag_task = asyncio.create_task(watch_event_loop_lag())
+
     yield
+
+    loop_lag_task.cancel()
     
-    # Cancel the scheduler on shutdown
-    scheduler_task.cancel()
+    # Stop the scheduler (and its watchdog) on shutdown
+    await watchdog.stop()
     
     # Stop the bot (polling) - Telebot doesn't have a clean stop for async polling in the same way, 
     # but cancelling the task usually works or it stops when event loop closes.
     bot_task.cancel()
     
     try:
-        await scheduler_task
         await bot_task
     except asyncio.CancelledError:
         pass
 
+    # Release pooled probe connections once no more checks can run
+    await probe_pool.aclose()
+
+    # Flush any results still queued
+    await result_writer.stop()
+
+    # Unfinished notifications stay in the outbox and are retried on next start
+    await notification_outbox.stop()
+    await broadcast_runner.stop()
+    await telegram_sender.stop()
+    await mailer.aclose()
+
 app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
@@ -39,7 +76,20 @@ async def read_root():
 
 @app.get("/health")
 async def get_health():
-    return {"status": "ok"}
+    # Liveness: fails only when the scheduler is dead or stuck
+    report = health_report()
+    return JSONResponse(report, status_code=200 if report["alive"] else 503)
+
+@app.get("/ready")
+async def get_ready():
+    # Readiness: also fails when checks fall behind or results pile up
+    report = health_report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 app.include_router(users.router)
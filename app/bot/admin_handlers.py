@@ -7,6 +7,7 @@ from app.bot import keyboards
 from app.database.connection import async_session
 from app.models import User, Monitor
 from app.config import ADMIN_IDS
+from app.services.broadcast_service import broadcast_runner
 
 # State Management for admin actions
 STATES = {}
@@ -135,39 +136,9 @@ async def callback_broadcast_confirm(call):
         return
 
     msg = await bot.send_message(call.message.chat.id, "⏳ Sending broadcast...", disable_web_page_preview=True)
-    
-    success_count = 0
-    fail_count = 0
-    
-    async with async_session() as session:
-        result = await session.execute(select(User.telegram_id))
-        users = result.scalars().all()
-        
-        for uid in users:
-            try:
-                if content.get('type') == 'forward':
-                    await bot.forward_message(uid, content['from_chat_id'], content['message_id'])
-                elif content['type'] == 'photo':
-                    await bot.send_photo(uid, content['file_id'], caption=content['text'], disable_web_page_preview=True)
-                else:
-                    await bot.send_message(uid, content['text'], disable_web_page_preview=True)
-                success_count += 1
-            except Exception as e:
-                fail_count += 1
-                
-    result_text = (
-        f"✅ **Broadcast Completed**\n\n"
-        f"📨 Sent: `{success_count}`\n"
-        f"❌ Failed: `{fail_count}`"
-    )
-    
-    await bot.edit_message_text(
-        chat_id=call.message.chat.id, 
-        message_id=msg.message_id, 
-        text=result_text, 
-        parse_mode='Markdown',
-        reply_markup=keyboards.admin_menu()
-    )
+
+    # Runs in the background; progress and the final counts are edited into msg
+    await broadcast_runner.create(call.message.chat.id, msg.message_id, content)
     STATES[user_id] = {}
 
 
@@ -5,12 +5,14 @@ from sqlalchemy.future import select
 from sqlalchemy import func
 from sqlalchemy.orm import selectinload
 from app.bot.loader import bot
+from app.bot.sender import telegram_sender
 from app.bot import keyboards
 from app.database.connection import async_session
 from app.models import User, Monitor
 from app.schemas.monitor import MonitorCreate
 from app.services.stats_service import get_monitor_stats
 from app.services.email_service import send_email
+from app.services.scheduler import scheduler
 from app.config import ADMIN_IDS
 import re
 import uuid
@@ -101,7 +103,7 @@ async def admin_reply(message):
         return
 
     try:
-        await bot.send_message(target_id, f"Admin reply:\n{reply_body}", disable_web_page_preview=True)
+        await telegram_sender.send(target_id, text=f"Admin reply:\n{reply_body}", disable_web_page_preview=True)
         await bot.reply_to(message, "Sent!", disable_web_page_preview=True)
     except Exception as exc:
         await bot.reply_to(message, f"Could not deliver reply: {exc}", disable_web_page_preview=True)
@@ -302,6 +304,7 @@ async def process_name_step(message):
             )
             session.add(new_monitor)
             await session.commit()
+            scheduler.invalidate(new_monitor.id)
             
         await bot.reply_to(message, f"✅ Site Added!\nName: {name}\nURL: {url}", reply_markup=keyboards.main_menu(), disable_web_page_preview=True)
         
@@ -329,7 +332,7 @@ async def process_feedback_step(message):
     for admin_id in ADMIN_IDS:
         try:
             # Forward the user's original message
-            await bot.forward_message(admin_id, user_id, message.message_id)
+            await telegram_sender.send(admin_id, "forward_message", user_id, message.message_id)
             
             # Send user info and reply instructions
             user_info = f"New feedback from user {user_id}"
@@ -338,7 +341,7 @@ async def process_feedback_step(message):
             
             reply_instruction = f"To reply, use: /reply {user_id} <your message>"
             
-            await bot.send_message(admin_id, f"{user_info}\n{reply_instruction}")
+            await telegram_sender.send(admin_id, text=f"{user_info}\n{reply_instruction}")
             admin_delivered = True
         except Exception as e:
             print(f"Failed to forward feedback to admin {admin_id}: {e}")
@@ -502,6 +505,7 @@ async def callback_toggle_pause(call):
         if monitor:
             monitor.is_active = (action == 'resume')
             await session.commit()
+            scheduler.invalidate(monitor_id)
             
             status_text = "Resumed" if action == 'resume' else "Paused"
             await bot.answer_callback_query(call.id, f"Monitor {status_text}!")
@@ -538,8 +542,8 @@ async def callback_check_now(call):
             result = await session.execute(stmt)
             monitor_full = result.scalars().first()
             
-            is_up = await check_single_monitor(monitor_full, session)
-            await session.commit()
+        # The result is queued for the batched writer; the session is only used for loading
+        is_up = await check_single_monitor(monitor_full)
             
         emoji = "🟢 UP" if is_up else "🔴 DOWN"
         await bot.send_message(call.message.chat.id, f"Check Complete for {monitor_full.name}:\nResult: **{emoji}**", parse_mode='Markdown', disable_web_page_preview=True)
@@ -572,6 +576,15 @@ async def callback_stats_menu(call):
         f"**Performance**\n"
         f"• Avg Latency (24h): {stats['avg_latency_24h']:.3f}s\n"
     )
+
+    phase_labels = {"dns": "DNS", "connect": "Connect", "tls": "TLS", "ttfb": "TTFB", "transfer": "Transfer"}
+    phases = [
+        f"{label} {stats['avg_phases_24h'][key]:.3f}s"
+        for key, label in phase_labels.items()
+        if stats['avg_phases_24h'].get(key) is not None
+    ]
+    if phases:
+        text += f"• Breakdown: {' · '.join(phases)}\n"
     
     await bot.edit_message_text(
         chat_id=call.message.chat.id,
@@ -627,6 +640,7 @@ async def callback_edit_monitor_menu(call):
         if sub_action == 'ssl':
             monitor.check_ssl = not monitor.check_ssl
             await session.commit()
+            scheduler.invalidate(monitor_id)
             status = "enabled" if monitor.check_ssl else "disabled"
             await bot.answer_callback_query(call.id, f"SSL Check {status}")
             
@@ -637,6 +651,25 @@ async def callback_edit_monitor_menu(call):
                 reply_markup=keyboards.monitor_edit_menu(monitor_id_str, monitor)
             )
 
+        elif sub_action == 'probe':
+            from app.services.monitor_service import PROBE_METHODS, resolve_probe_method
+
+            current = monitor.probe_method or "AUTO"
+            monitor.probe_method = PROBE_METHODS[(PROBE_METHODS.index(current) + 1) % len(PROBE_METHODS)] if current in PROBE_METHODS else "AUTO"
+            await session.commit()
+            scheduler.invalidate(monitor_id)
+
+            if monitor.keyword_include or monitor.keyword_exclude:
+                await bot.answer_callback_query(call.id, f"Probe: {monitor.probe_method} (keyword checks always use GET)")
+            else:
+                await bot.answer_callback_query(call.id, f"Probe: {monitor.probe_method} (runs {resolve_probe_method(monitor)})")
+
+            await bot.edit_message_reply_markup(
+                chat_id=call.message.chat.id,
+                message_id=call.message.message_id,
+                reply_markup=keyboards.monitor_edit_menu(monitor_id_str, monitor)
+            )
+
         elif sub_action == 'kw':
             STATES[call.from_user.id] = {'state': STATE_WAITING_KEYWORD_INC, 'monitor_id': monitor_id_str}
             await bot.send_message(
@@ -704,6 +737,7 @@ async def process_keyword_step(message):
             if monitor:
                 monitor.keyword_include = kw_inc
                 await session.commit()
+                scheduler.invalidate(monitor_id)
                 await bot.reply_to(message, "✅ Keyword settings updated!", disable_web_page_preview=True)
                 
                 # Show updated menu
@@ -733,6 +767,7 @@ async def process_latency_step(message):
             if monitor:
                 monitor.max_response_time = val
                 await session.commit()
+                scheduler.invalidate(monitor_id)
                 await bot.reply_to(message, "✅ Latency threshold updated!", disable_web_page_preview=True)
                 
                 # Show updated menu
@@ -764,6 +799,7 @@ async def process_timeout_step(message):
             if monitor:
                 monitor.timeout_seconds = val
                 await session.commit()
+                scheduler.invalidate(monitor_id)
                 await bot.reply_to(message, "✅ Timeout updated!", disable_web_page_preview=True)
                 await bot.send_message(message.chat.id, f"Back to settings for {monitor.name}:", reply_markup=keyboards.monitor_edit_menu(str(monitor_id), monitor), disable_web_page_preview=True)
         del STATES[user_id]
@@ -785,6 +821,7 @@ async def process_status_step(message):
             if monitor:
                 monitor.expected_status = val
                 await session.commit()
+                scheduler.invalidate(monitor_id)
                 await bot.reply_to(message, "✅ Expected Status updated!", disable_web_page_preview=True)
                 await bot.send_message(message.chat.id, f"Back to settings for {monitor.name}:", reply_markup=keyboards.monitor_edit_menu(str(monitor_id), monitor), disable_web_page_preview=True)
         del STATES[user_id]
@@ -846,6 +883,7 @@ async def callback_confirm_delete_monitor(call):
         if monitor:
             await session.delete(monitor)
             await session.commit()
+            scheduler.invalidate(monitor_id)
             
     await bot.answer_callback_query(call.id, "Monitor deleted.")
     await callback_back_to_list(call)
@@ -120,6 +120,11 @@ def monitor_edit_menu(monitor_id, monitor: Monitor):
          InlineKeyboardButton(f"🔢 Status: {monitor.expected_status or '2xx'}", callback_data=f"edit_status_{monitor_id}")
     )
 
+    # Probe method (tap to cycle)
+    markup.add(
+        InlineKeyboardButton(f"🛰 Probe: {monitor.probe_method or 'AUTO'}", callback_data=f"edit_probe_{monitor_id}")
+    )
+
     markup.add(InlineKeyboardButton("🔙 Back to Monitor", callback_data=f"site_{monitor_id}"))
     return markup
 
@@ -4,12 +4,18 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# "disabled", "starting", "running", "stopped" or "failed"; reported by /health
+polling_status = "disabled"
+
 # Register handlers logic only if bot is active
 if bot:
     import app.bot.handlers 
     import app.bot.admin_handlers
+    from app.bot.middlewares import HandlerTimingMiddleware
+    bot.setup_middleware(HandlerTimingMiddleware())
 
 async def start_bot():
+    global polling_status
     if not bot:
         logger.warning("Bot token not set, skipping bot startup.")
         return
@@ -18,7 +24,13 @@ async def start_bot():
     # remove webhook before polling if it was set
     # await bot.remove_webhook() 
     
+    polling_status = "running"
     try:
         await bot.infinity_polling(logger_level=logging.INFO)
+        polling_status = "stopped"
+    except asyncio.CancelledError:
+        polling_status = "stopped"
+        raise
     except Exception as e:
+        polling_status = "failed"
         logger.error(f"Bot polling failed: {e}")
@@ -0,0 +1,20 @@
+import time
+from telebot.asyncio_handler_backends import BaseMiddleware
+from app.services import metrics
+
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    """Records how long the bot takes to handle each message and callback query."""
+
+    def __init__(self):
+        super().__init__()
+        self.update_types = ['message', 'callback_query']
+
+    async def pre_process(self, message, data):
+        data['_handler_started'] = time.perf_counter()
+
+    async def post_process(self, message, data, exception):
+        started = data.get('_handler_started')
+        if started is not None:
+            update_type = 'callback_query' if hasattr(message, 'data') and hasattr(message, 'message') else 'message'
+            metrics.bot_handler_duration.observe(time.perf_counter() - started, update_type=update_type)
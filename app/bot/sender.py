@@ -0,0 +1,210 @@
+import asyncio
+import heapq
+import itertools
+import time
+from app.bot.loader import bot
+from app.config import TELEGRAM_GLOBAL_RATE, TELEGRAM_PER_CHAT_INTERVAL, TELEGRAM_MAX_ATTEMPTS
+from app.services import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes: lower goes first
+PRIORITY_ALERT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+
+class _Job:
+    __slots__ = ("chat_id", "method", "args", "kwargs", "future", "attempts")
+
+    def __init__(self, chat_id, method, args, kwargs, future):
+        self.chat_id = chat_id
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.attempts = 0
+
+
+def _retry_after(exc) -> float | None:
+    """Seconds Telegram asked us to wait, if this was a 429."""
+    if getattr(exc, "error_code", None) != 429:
+        return None
+    result = getattr(exc, "result_json", None) or {}
+    return float((result.get("parameters") or {}).get("retry_after", 1))
+
+
+class TelegramSender:
+    """
+    Paces outgoing bot messages to Telegram's limits.
+
+    A global token bucket allows `global_rate` sends per second, and each chat
+    gets at most one message per `per_chat_interval`. Every chat has its own
+    queue ordered by priority lane (alerts before normal traffic before
+    broadcasts), and the dispatcher always sends the highest-priority message
+    among the chats that are allowed to receive one. A 429 puts the message
+    back at the front of its chat's queue and holds that chat for the
+    `retry_after` Telegram returned, so throttling delays messages instead of
+    dropping them.
+    """
+
+    def __init__(self, global_rate: float = TELEGRAM_GLOBAL_RATE, per_chat_interval: float = TELEGRAM_PER_CHAT_INTERVAL, max_attempts: int = TELEGRAM_MAX_ATTEMPTS):
+        self.global_rate = global_rate
+        self.per_chat_interval = per_chat_interval
+        self.max_attempts = max_attempts
+
+        self._seq = itertools.count()
+        self._queues: dict[int, list] = {}          # chat_id -> heap of (priority, seq, job)
+        self._ready: list = []                      # heap of (priority, seq, chat_id); validated lazily
+        self._waiting: list = []                    # heap of (available_at, chat_id)
+        self._available_at: dict[int, float] = {}   # chat_id -> earliest next send
+        self._tokens = max(1.0, global_rate)
+        self._tokens_at: float | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._sending: set[asyncio.Task] = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops dispatching; callers still waiting on unsent messages get CancelledError."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for task in list(self._sending):
+            task.cancel()
+        await asyncio.gather(*self._sending, return_exceptions=True)
+        for queue in self._queues.values():
+            for _, _, job in queue:
+                job.future.cancel()
+        self._queues.clear()
+        self._ready.clear()
+        self._waiting.clear()
+        self._available_at.clear()
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def send(self, chat_id: int, method: str = "send_message", *args, priority: int = PRIORITY_NORMAL, **kwargs):
+        """
+        Queues bot.<method>(chat_id, *args, **kwargs) and waits for it to be sent.
+        Returns Telegram's result or raises the final error.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._push(_Job(chat_id, method, args, kwargs, future), priority, next(self._seq))
+        return await future
+
+    # --- Queues ---
+
+    def _push(self, job: _Job, priority: int, seq: int):
+        queue = self._queues.setdefault(job.chat_id, [])
+        heapq.heappush(queue, (priority, seq, job))
+        if queue[0][2] is job:
+            self._offer(job.chat_id)
+        self._wakeup.set()
+
+    def _offer(self, chat_id: int):
+        """(Re)announces a chat's head message to the dispatcher."""
+        queue = self._queues.get(chat_id)
+        if not queue:
+            return
+        now = asyncio.get_running_loop().time()
+        available_at = self._available_at.get(chat_id, 0.0)
+        if available_at > now:
+            heapq.heappush(self._waiting, (available_at, chat_id))
+        else:
+            priority, seq, _ = queue[0]
+            heapq.heappush(self._ready, (priority, seq, chat_id))
+
+    def _next_job(self, now: float) -> _Job | None:
+        while self._waiting and self._waiting[0][0] <= now:
+            _, chat_id = heapq.heappop(self._waiting)
+            self._offer(chat_id)
+
+        while self._ready:
+            priority, seq, chat_id = heapq.heappop(self._ready)
+            queue = self._queues.get(chat_id)
+            if not queue or queue[0][:2] != (priority, seq) or self._available_at.get(chat_id, 0.0) > now:
+                continue  # stale announcement
+            job = heapq.heappop(queue)[2]
+            if not queue:
+                del self._queues[chat_id]
+            self._available_at[chat_id] = now + self.per_chat_interval
+            self._offer(chat_id)
+            return job
+        return None
+
+    def _take_token(self, now: float) -> float:
+        """Returns 0 if a send may start now, else seconds until the next token."""
+        if self.global_rate <= 0:
+            return 0.0
+        if self._tokens_at is not None:
+            # At least one token of capacity, so rates below 1/s still send
+            self._tokens = min(max(1.0, self.global_rate), self._tokens + (now - self._tokens_at) * self.global_rate)
+        self._tokens_at = now
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.global_rate
+        return 0.0
+
+    # --- Dispatch ---
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            wait = self._take_token(now)
+            job = self._next_job(now) if wait == 0 else None
+            if job is not None:
+                self._tokens -= 1
+                task = asyncio.create_task(self._attempt(job))
+                self._sending.add(task)
+                task.add_done_callback(self._sending.discard)
+                continue
+
+            if wait == 0:
+                wait = (self._waiting[0][0] - now) if self._waiting else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _attempt(self, job: _Job):
+        job.attempts += 1
+        started = time.perf_counter()
+        try:
+            result = await getattr(bot, job.method)(job.chat_id, *job.args, **job.kwargs)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            metrics.telegram_send_duration.observe(time.perf_counter() - started, outcome="error")
+            retry_after = _retry_after(e)
+            if retry_after is not None and job.attempts < self.max_attempts:
+                metrics.telegram_throttled_total.inc()
+                logger.warning(f"Telegram rate limit for chat {job.chat_id}; retrying in {retry_after:.0f}s.")
+                now = asyncio.get_running_loop().time()
+                self._available_at[job.chat_id] = max(self._available_at.get(job.chat_id, 0.0), now + retry_after)
+                # Back at the front of its chat's queue
+                self._push(job, PRIORITY_ALERT - 1, -job.attempts)
+                return
+            if not job.future.done():
+                job.future.set_exception(e)
+            return
+        metrics.telegram_send_duration.observe(time.perf_counter() - started, outcome="ok")
+        if not job.future.done():
+            job.future.set_result(result)
+
+
+telegram_sender = TelegramSender()
+metrics.telegram_send_backlog.set_function(lambda: telegram_sender.backlog)
@@ -68,12 +68,85 @@ API_ACCESS_TOKEN = os.getenv("API_ACCESS_TOKEN")
 
 BREVO_API_KEY = os.getenv("BREVO_API_KEY")
 BREVO_SENDER_EMAIL = os.getenv("BREVO_SENDER_EMAIL")
+BREVO_API_URL = os.getenv("BREVO_API_URL", "https://api.brevo.com/v3")
+EMAIL_BATCH_WINDOW = float(os.getenv("EMAIL_BATCH_WINDOW", "2"))
+EMAIL_BATCH_MAX = int(os.getenv("EMAIL_BATCH_MAX", "100"))
 
 DB_ECHO = os.getenv("DB_ECHO", "false").lower() in {"1", "true", "yes", "on"}
 
 # Admin Config
 ADMIN_IDS = [int(x.strip()) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit()]
 
+# Probe HTTP client pool
+PROBE_MAX_CONNECTIONS = int(os.getenv("PROBE_MAX_CONNECTIONS", "200"))
+PROBE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("PROBE_MAX_KEEPALIVE_CONNECTIONS", "100"))
+PROBE_KEEPALIVE_EXPIRY = float(os.getenv("PROBE_KEEPALIVE_EXPIRY", "30"))
+PROBE_MAX_BODY_BYTES = int(os.getenv("PROBE_MAX_BODY_BYTES", str(1024 * 1024)))
+
+# Scheduler
+SCHEDULER_RECONCILE_SECONDS = int(os.getenv("SCHEDULER_RECONCILE_SECONDS", "300"))
+SCHEDULER_HEARTBEAT_SECONDS = int(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", "10"))
+SCHEDULER_NODE_TTL_SECONDS = int(os.getenv("SCHEDULER_NODE_TTL_SECONDS", "30"))
+SCHEDULER_DUE_SWEEP_SECONDS = int(os.getenv("SCHEDULER_DUE_SWEEP_SECONDS", "15"))
+SCHEDULER_DUE_SWEEP_LIMIT = int(os.getenv("SCHEDULER_DUE_SWEEP_LIMIT", "500"))
+CHECK_CONCURRENCY = int(os.getenv("CHECK_CONCURRENCY", "50"))
+CHECK_CONCURRENCY_PER_HOST = int(os.getenv("CHECK_CONCURRENCY_PER_HOST", "4"))
+CHECK_COALESCE_WINDOW = float(os.getenv("CHECK_COALESCE_WINDOW", "1.0"))
+CHECK_MAX_START_RATE = float(os.getenv("CHECK_MAX_START_RATE", "50"))
+CHECK_OVERLOAD_POLICY = os.getenv("CHECK_OVERLOAD_POLICY", "stretch").lower() # stretch, shed or off
+CHECK_OVERLOAD_HEADROOM = float(os.getenv("CHECK_OVERLOAD_HEADROOM", "0.9"))
+CHECK_MAX_STRETCH = float(os.getenv("CHECK_MAX_STRETCH", "4"))
+CHECK_RETRY_DELAY = float(os.getenv("CHECK_RETRY_DELAY", "2"))
+CHECK_RETRY_BACKOFF = float(os.getenv("CHECK_RETRY_BACKOFF", "2"))
+CHECK_RETRY_MAX_DELAY = float(os.getenv("CHECK_RETRY_MAX_DELAY", "30"))
+
+# Monitor configuration cache
+MONITOR_CACHE_TTL_SECONDS = int(os.getenv("MONITOR_CACHE_TTL_SECONDS", "300"))
+
+# Status state machine & flap detection
+FLAP_WINDOW = int(os.getenv("FLAP_WINDOW", "20"))
+FLAP_HIGH_THRESHOLD = float(os.getenv("FLAP_HIGH_THRESHOLD", "0.4"))
+FLAP_LOW_THRESHOLD = float(os.getenv("FLAP_LOW_THRESHOLD", "0.2"))
+FLAP_MIN_SAMPLES = int(os.getenv("FLAP_MIN_SAMPLES", "10"))
+FLAP_MIN_CHANGES = int(os.getenv("FLAP_MIN_CHANGES", "3"))
+STATUS_RECOVERY_CHECKS = int(os.getenv("STATUS_RECOVERY_CHECKS", "2"))
+
+# Cross-process change propagation (Postgres LISTEN/NOTIFY)
+CHANGE_FEED_ENABLED = os.getenv("CHANGE_FEED_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+
+# Notification outbox
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "10"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+NOTIFY_DIGEST_WINDOW = float(os.getenv("NOTIFY_DIGEST_WINDOW", "30"))
+NOTIFY_IMMEDIATE_FIRST = os.getenv("NOTIFY_IMMEDIATE_FIRST", "true").lower() in {"1", "true", "yes", "on"}
+
+# Telegram send pacing
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_PER_CHAT_INTERVAL = float(os.getenv("TELEGRAM_PER_CHAT_INTERVAL", "1"))
+TELEGRAM_MAX_ATTEMPTS = int(os.getenv("TELEGRAM_MAX_ATTEMPTS", "5"))
+
+# Broadcasts
+BROADCAST_PAGE_SIZE = int(os.getenv("BROADCAST_PAGE_SIZE", "200"))
+BROADCAST_LEASE_SECONDS = int(os.getenv("BROADCAST_LEASE_SECONDS", "120"))
+BROADCAST_POLL_SECONDS = float(os.getenv("BROADCAST_POLL_SECONDS", "30"))
+BROADCAST_PROGRESS_SECONDS = float(os.getenv("BROADCAST_PROGRESS_SECONDS", "5"))
+
+# Health & watchdog
+SCHEDULER_STALL_SECONDS = int(os.getenv("SCHEDULER_STALL_SECONDS", "60"))
+WATCHDOG_INTERVAL_SECONDS = int(os.getenv("WATCHDOG_INTERVAL_SECONDS", "15"))
+HEALTH_MAX_OVERDUE_SECONDS = int(os.getenv("HEALTH_MAX_OVERDUE_SECONDS", "120"))
+HEALTH_MAX_WRITER_BACKLOG = int(os.getenv("HEALTH_MAX_WRITER_BACKLOG", "5000"))
+
+# Check result writer
+RESULT_BATCH_SIZE = int(os.getenv("RESULT_BATCH_SIZE", "200"))
+RESULT_FLUSH_INTERVAL = float(os.getenv("RESULT_FLUSH_INTERVAL", "1.0"))
+
+# SSL certificate expiry cache
+SSL_CACHE_TTL_SECONDS = int(os.getenv("SSL_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env file or environment variables")
 
@@ -3,7 +3,7 @@ from datetime import datetime
 
 from sqlalchemy import (
     Column, String, Float, DateTime,
-    BigInteger, Boolean, Integer, ForeignKey, Uuid
+    BigInteger, Boolean, Integer, ForeignKey, Uuid, Index, text
 )
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
@@ -73,6 +73,7 @@ class Monitor(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_checked = Column(DateTime(timezone=True), nullable=True)
+    next_check_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True) # planned next check, kept by the owning scheduler
 
     # Pro Features
     check_ssl = Column(Boolean, default=False, nullable=False)
@@ -84,6 +85,9 @@ class Monitor(Base):
     max_response_time = Column(Float, nullable=True) # Latency threshold in seconds
     
     consecutive_checks = Column(Integer, default=3, nullable=False) # For double-check logic
+    fresh_connection = Column(Boolean, default=False, nullable=False) # Skip keep-alive to measure cold latency
+    max_body_bytes = Column(Integer, nullable=True) # Keyword scan cap, falls back to PROBE_MAX_BODY_BYTES
+    probe_method = Column(String, default="AUTO", nullable=False) # AUTO, GET, HEAD, RANGE, TCP or DNS
 
     owner = relationship("User", back_populates="monitors")
     checks = relationship(
@@ -97,6 +101,11 @@ class Monitor(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Due-monitor range reads only ever look at active monitors
+        Index("ix_monitors_next_check_at", "next_check_at", postgresql_where=text("is_active")),
+    )
+
 
 class MaintenanceWindow(Base):
     __tablename__ = "maintenance_windows"
@@ -107,6 +116,7 @@ class MaintenanceWindow(Base):
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
     description = Column(String, nullable=True)
+    recurrence = Column(String, nullable=True) # None (one-off), "daily" or "weekly", repeating the start/end times
     
     monitor = relationship("Monitor", back_populates="maintenance_windows")
 
@@ -128,7 +138,91 @@ class CheckLog(Base):
     is_up = Column(Boolean, nullable=False)
 
     error_message = Column(String, nullable=True)
+    bytes_read = Column(Integer, nullable=True)
+
+    # Per-phase timings in seconds (None when the probe skipped that phase)
+    dns_time = Column(Float, nullable=True)
+    connect_time = Column(Float, nullable=True) # Includes name resolution for HTTP probes
+    tls_time = Column(Float, nullable=True)
+    ttfb = Column(Float, nullable=True)
+    transfer_time = Column(Float, nullable=True)
 
     checked_at = Column(DateTime(timezone=True), server_default=func.now())
 
     monitor = relationship("Monitor", back_populates="checks")
+
+
+class SchedulerNode(Base):
+    __tablename__ = "scheduler_nodes"
+
+    # One row per running scheduler (process), refreshed by its heartbeat
+    node_id = Column(String, primary_key=True)
+    hostname = Column(String, nullable=True)
+
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    heartbeat_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    # monitor + time + new status, so the same transition is never queued twice
+    idempotency_key = Column(String, unique=True, nullable=False)
+
+    monitor_id = Column(
+        Uuid,
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    previous_status = Column(Boolean, nullable=True)
+    current_status = Column(Boolean, nullable=False)
+    error_details = Column(String, nullable=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+
+    status = Column(String, default="pending", nullable=False) # pending, sent or failed
+    attempts = Column(Integer, default=0, nullable=False)
+    delivered_channels = Column(String, default="", nullable=False) # comma-separated, never re-sent on retry
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "next_attempt_at", postgresql_where=text("status = 'pending'")),
+    )
+
+
+class BroadcastJob(Base):
+    __tablename__ = "broadcast_jobs"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+
+    # Where progress is reported
+    admin_chat_id = Column(BigInteger, nullable=False)
+    progress_message_id = Column(Integer, nullable=True)
+
+    # What is sent (mirrors the admin's broadcast content)
+    content_type = Column(String, nullable=False) # forward, photo or text
+    message_text = Column(String, nullable=True) # not "text": that would shadow sqlalchemy.text in __table_args__
+    file_id = Column(String, nullable=True)
+    from_chat_id = Column(BigInteger, nullable=True)
+    source_message_id = Column(Integer, nullable=True)
+
+    status = Column(String, default="running", nullable=False) # running or completed
+    # Recipients are walked in telegram_id order; everything up to the cursor has been attempted
+    cursor = Column(BigInteger, nullable=True)
+    total = Column(Integer, default=0, nullable=False)
+    sent_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    lease_until = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_broadcast_jobs_running", "lease_until", postgresql_where=text("status = 'running'")),
+    )
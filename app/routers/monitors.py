@@ -3,10 +3,12 @@ from fastapi import FastAPI
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import func
 from app.database.connection import get_db
 from app.models import User, Monitor
 from app.schemas.monitor import MonitorCreate, MonitorResponse, MonitorUpdate
 from app.security import require_api_key
+from app.services.scheduler import scheduler
 
 router = APIRouter(
     prefix="/monitors",
@@ -38,11 +40,15 @@ async def create_monitor(monitor: MonitorCreate, db: AsyncSession = Depends(get_
         keyword_include=monitor.keyword_include,
         keyword_exclude=monitor.keyword_exclude,
         max_response_time=monitor.max_response_time,
-        consecutive_checks=monitor.consecutive_checks
+        consecutive_checks=monitor.consecutive_checks,
+        fresh_connection=monitor.fresh_connection,
+        max_body_bytes=monitor.max_body_bytes,
+        probe_method=monitor.probe_method or "AUTO"
     )
     db.add(new_monitor)
     await db.commit()
     await db.refresh(new_monitor)
+    scheduler.invalidate(new_monitor.id)
     return new_monitor
 
 @router.get("/user/{telegram_id}", response_model=list[MonitorResponse])
@@ -84,6 +90,7 @@ async def delete_monitor(monitor_id: uuid.UUID, telegram_id: int, db: AsyncSessi
     
     await db.delete(existing_monitor)
     await db.commit()
+    scheduler.invalidate(monitor_id)
     return {"detail": "Monitor deleted successfully"}
 
 @router.put("/{monitor_id}", response_model=MonitorResponse)
@@ -108,6 +115,11 @@ async def update_monitor(monitor_id: uuid.UUID, monitor_update: MonitorUpdate, d
         monitor.name = monitor_update.name
     if monitor_update.interval_seconds is not None:
         monitor.interval_seconds = monitor_update.interval_seconds
+        # A shorter interval must not leave the next check further out than the new one;
+        # the owning scheduler then rewrites it with the exact phase slot
+        monitor.next_check_at = func.least(
+            Monitor.next_check_at, func.now() + func.make_interval(0, 0, 0, 0, 0, 0, monitor_update.interval_seconds)
+        )
     if monitor_update.timeout_seconds is not None:
         monitor.timeout_seconds = monitor_update.timeout_seconds
     if monitor_update.expected_status is not None:
@@ -128,9 +140,16 @@ async def update_monitor(monitor_id: uuid.UUID, monitor_update: MonitorUpdate, d
         monitor.max_response_time = monitor_update.max_response_time
     if monitor_update.consecutive_checks is not None:
         monitor.consecutive_checks = monitor_update.consecutive_checks
+    if monitor_update.fresh_connection is not None:
+        monitor.fresh_connection = monitor_update.fresh_connection
+    if monitor_update.max_body_bytes is not None:
+        monitor.max_body_bytes = monitor_update.max_body_bytes
+    if monitor_update.probe_method is not None:
+        monitor.probe_method = monitor_update.probe_method
 
     await db.commit()
     await db.refresh(monitor)
+    scheduler.invalidate(monitor.id)
     return monitor
 
 @router.get("", response_model=list[MonitorResponse])
@@ -9,6 +9,12 @@ class CheckLogBase(BaseModel):
     response_time: Optional[float] = None
     is_up: bool
     error_message: Optional[str] = None
+    bytes_read: Optional[int] = None
+    dns_time: Optional[float] = None
+    connect_time: Optional[float] = None
+    tls_time: Optional[float] = None
+    ttfb: Optional[float] = None
+    transfer_time: Optional[float] = None
 
 class CheckLogCreate(CheckLogBase):
     pass
@@ -1,9 +1,11 @@
 from pydantic import BaseModel, HttpUrl, field_validator, validator
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import Literal, Optional
 import re
 
+ProbeMethod = Literal["AUTO", "GET", "HEAD", "RANGE", "TCP", "DNS"]
+
 class MonitorBase(BaseModel):
     url: HttpUrl
     name: str
@@ -19,6 +21,9 @@ class MonitorBase(BaseModel):
     keyword_exclude: Optional[str] = None
     max_response_time: Optional[float] = None # seconds
     consecutive_checks: Optional[int] = 3
+    fresh_connection: Optional[bool] = False
+    max_body_bytes: Optional[int] = None # bytes scanned for keywords
+    probe_method: Optional[ProbeMethod] = "AUTO" # keyword rules always use GET
 
     @field_validator('url', mode='before')
     @classmethod
@@ -65,6 +70,9 @@ class MonitorUpdate(BaseModel):
     keyword_exclude: Optional[str] = None
     max_response_time: Optional[float] = None
     consecutive_checks: Optional[int] = None
+    fresh_connection: Optional[bool] = None
+    max_body_bytes: Optional[int] = None
+    probe_method: Optional[ProbeMethod] = None
 
     @field_validator('url', mode='before')
     @classmethod
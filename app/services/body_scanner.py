@@ -0,0 +1,63 @@
+from typing import Callable, Iterable
+
+
+class KeywordScanner:
+    """
+    Looks for keywords in a response body chunk by chunk.
+
+    The last `len(longest keyword) - 1` bytes of each chunk are carried over to
+    the next one, so matches that straddle a chunk boundary are still found
+    without ever holding the whole body in memory.
+    """
+
+    def __init__(self, keywords: Iterable[str], encoding: str | None = None):
+        encoding = encoding or 'utf-8'
+        self._pending: dict[str, bytes] = {}
+        for keyword in keywords:
+            if keyword:
+                self._pending[keyword] = keyword.encode(encoding, errors='ignore') or keyword.encode('utf-8')
+        self.found: set[str] = set()
+        self._overlap = max((len(needle) for needle in self._pending.values()), default=1) - 1
+        self._tail = b""
+
+    @property
+    def done(self) -> bool:
+        """True once every keyword has been found."""
+        return not self._pending
+
+    def feed(self, chunk: bytes):
+        if not self._pending:
+            return
+        data = self._tail + chunk
+        for keyword, needle in list(self._pending.items()):
+            if needle in data:
+                self.found.add(keyword)
+                del self._pending[keyword]
+        self._tail = data[-self._overlap:] if self._overlap else b""
+
+
+async def scan_body(response, scanner: KeywordScanner, max_bytes: int | None, is_decided: Callable[[], bool]) -> tuple[int, bool]:
+    """
+    Streams the body of an open httpx response into the scanner.
+
+    Stops as soon as is_decided() returns True or max_bytes have been read.
+    Returns (bytes_read, truncated) where truncated means the cap was hit
+    before the end of the body.
+    """
+    bytes_read = 0
+    if is_decided():
+        return bytes_read, False
+
+    async for chunk in response.aiter_bytes():
+        if max_bytes is not None and bytes_read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - bytes_read]
+            bytes_read += len(chunk)
+            scanner.feed(chunk)
+            return bytes_read, True
+
+        bytes_read += len(chunk)
+        scanner.feed(chunk)
+        if is_decided():
+            break
+
+    return bytes_read, False
@@ -0,0 +1,230 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from app.bot import keyboards
+from app.bot.loader import bot
+from app.bot.sender import telegram_sender, PRIORITY_BULK
+from app.config import BROADCAST_PAGE_SIZE, BROADCAST_LEASE_SECONDS, BROADCAST_POLL_SECONDS, BROADCAST_PROGRESS_SECONDS
+from app.database.connection import async_session
+from app.models import BroadcastJob, User
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastRunner:
+    """
+    Runs admin broadcasts as persisted jobs.
+
+    Recipients are read a page at a time in telegram_id order, so no session is
+    held open while messages go out. Each page is handed to the Telegram sender
+    at once (in its bulk lane, which does the rate limiting), and when the page
+    is done the job's cursor and counters are checkpointed. A job is leased like
+    an outbox row and the lease is renewed every third of `lease_seconds` while
+    a page is in flight; every renewal and checkpoint only applies if the lease
+    is still ours, and a runner that lost it stops sending. If the process dies,
+    another runner (or this one after a restart) claims the job once the lease
+    expires and continues after the last checkpoint. At most the page in flight
+    at the crash is sent twice.
+    """
+
+    def __init__(
+        self,
+        page_size: int = BROADCAST_PAGE_SIZE,
+        lease_seconds: int = BROADCAST_LEASE_SECONDS,
+        poll_seconds: float = BROADCAST_POLL_SECONDS,
+        progress_seconds: float = BROADCAST_PROGRESS_SECONDS,
+    ):
+        self.page_size = max(1, page_size)
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.progress_seconds = progress_seconds
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._jobs: dict[uuid.UUID, asyncio.Task] = {}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Interrupted jobs resume from their checkpoint once the lease expires
+        tasks = [t for t in (self._task, *self._jobs.values()) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._jobs.clear()
+
+    async def create(self, admin_chat_id: int, progress_message_id: int, content: dict) -> uuid.UUID:
+        """Persists a broadcast of the admin's content to every user and wakes the runner."""
+        async with async_session() as session:
+            total = (await session.execute(select(func.count(User.id)))).scalar_one()
+            job = BroadcastJob(
+                id=uuid.uuid4(),
+                admin_chat_id=admin_chat_id,
+                progress_message_id=progress_message_id,
+                content_type=content['type'],
+                message_text=content.get('text'),
+                file_id=content.get('file_id'),
+                from_chat_id=content.get('from_chat_id'),
+                source_message_id=content.get('message_id'),
+                total=total,
+            )
+            session.add(job)
+            await session.commit()
+        self._wakeup.set()
+        return job.id
+
+    # --- Leasing ---
+
+    def _lease_until(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+
+    async def _claim(self) -> list[BroadcastJob]:
+        async with async_session() as session:
+            stmt = (
+                select(BroadcastJob)
+                .where(BroadcastJob.status == "running", BroadcastJob.lease_until <= func.now())
+                .order_by(BroadcastJob.created_at)
+                .with_for_update(skip_locked=True)
+            )
+            if self._jobs:
+                stmt = stmt.where(BroadcastJob.id.notin_(list(self._jobs)))
+            jobs = (await session.execute(stmt)).scalars().all()
+            for job in jobs:
+                job.lease_until = self._lease_until()
+            await session.commit()
+        return jobs
+
+    async def _renew(self, job: BroadcastJob, **values) -> bool:
+        """Extends the lease and writes `values`, only if the lease is still ours."""
+        lease_until = self._lease_until()
+        async with async_session() as session:
+            result = await session.execute(
+                update(BroadcastJob)
+                .where(BroadcastJob.id == job.id, BroadcastJob.lease_until == job.lease_until)
+                .values(lease_until=lease_until, **values)
+            )
+            await session.commit()
+        if result.rowcount != 1:
+            return False
+        job.lease_until = lease_until
+        return True
+
+    async def _keep_lease(self, job: BroadcastJob, lock: asyncio.Lock, owner: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with lock:
+                    renewed = await self._renew(job)
+            except Exception as e:
+                logger.warning(f"Could not renew lease of broadcast {job.id}: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost lease of broadcast {job.id}; stopping here.")
+                owner.cancel()
+                return
+
+    # --- Sending ---
+
+    def _send(self, job: BroadcastJob, uid: int):
+        if job.content_type == 'forward':
+            return telegram_sender.send(uid, "forward_message", job.from_chat_id, job.source_message_id, priority=PRIORITY_BULK)
+        elif job.content_type == 'photo':
+            return telegram_sender.send(uid, "send_photo", job.file_id, caption=job.message_text, disable_web_page_preview=True, priority=PRIORITY_BULK)
+        return telegram_sender.send(uid, text=job.message_text, disable_web_page_preview=True, priority=PRIORITY_BULK)
+
+    async def _report(self, job: BroadcastJob, final: bool = False):
+        if job.progress_message_id is None:
+            return
+        if final:
+            text = (
+                f"✅ **Broadcast Completed**\n\n"
+                f"📨 Sent: `{job.sent_count}`\n"
+                f"❌ Failed: `{job.failed_count}`"
+            )
+        else:
+            done = job.sent_count + job.failed_count
+            text = (
+                f"⏳ **Sending broadcast...** `{done}/{job.total}`\n\n"
+                f"📨 Sent: `{job.sent_count}`\n"
+                f"❌ Failed: `{job.failed_count}`"
+            )
+        try:
+            await bot.edit_message_text(
+                chat_id=job.admin_chat_id,
+                message_id=job.progress_message_id,
+                text=text,
+                parse_mode='Markdown',
+                reply_markup=keyboards.admin_menu() if final else None
+            )
+        except Exception as e:
+            logger.debug(f"Could not update progress of broadcast {job.id}: {e}")
+
+    async def _execute(self, job: BroadcastJob):
+        loop = asyncio.get_running_loop()
+        reported_at = loop.time()
+        logger.info(f"Broadcast {job.id} running from cursor {job.cursor}.")
+        lock = asyncio.Lock()
+        keeper = asyncio.create_task(self._keep_lease(job, lock, asyncio.current_task()))
+        try:
+            while True:
+                async with async_session() as session:
+                    stmt = select(User.telegram_id).order_by(User.telegram_id).limit(self.page_size)
+                    if job.cursor is not None:
+                        stmt = stmt.where(User.telegram_id > job.cursor)
+                    page = (await session.execute(stmt)).scalars().all()
+
+                if not page:
+                    break
+
+                outcomes = await asyncio.gather(*(self._send(job, uid) for uid in page), return_exceptions=True)
+                failed = sum(1 for outcome in outcomes if isinstance(outcome, BaseException))
+                job.cursor = page[-1]
+                job.sent_count += len(page) - failed
+                job.failed_count += failed
+
+                async with lock:
+                    if not await self._renew(job, cursor=job.cursor, sent_count=job.sent_count, failed_count=job.failed_count):
+                        logger.warning(f"Lost lease of broadcast {job.id} before checkpointing; stopping here.")
+                        return
+
+                if loop.time() - reported_at >= self.progress_seconds:
+                    reported_at = loop.time()
+                    await self._report(job)
+
+            async with lock:
+                if not await self._renew(job, status="completed", finished_at=func.now()):
+                    logger.warning(f"Lost lease of broadcast {job.id} before completing it.")
+                    return
+            logger.info(f"Broadcast {job.id} completed: {job.sent_count} sent, {job.failed_count} failed.")
+            await self._report(job, final=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Left running; picked up again from the last checkpoint when the lease expires
+            logger.error(f"Broadcast {job.id} interrupted: {e}")
+        finally:
+            keeper.cancel()
+            self._jobs.pop(job.id, None)
+
+    async def _run(self):
+        while True:
+            try:
+                for job in await self._claim():
+                    self._jobs[job.id] = asyncio.create_task(self._execute(job))
+            except Exception as e:
+                logger.error(f"Error claiming broadcast jobs: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+broadcast_runner = BroadcastRunner()
@@ -0,0 +1,100 @@
+import asyncio
+import uuid
+import asyncpg
+from sqlalchemy import text
+from app.config import CHANGE_FEED_ENABLED
+from app.database.connection import async_session, url_for_engine, connect_args
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "monitor_changes"
+
+
+class MonitorChangeFeed:
+    """
+    Propagates monitor edits between processes with Postgres LISTEN/NOTIFY.
+
+    publish() sends "<origin>:<monitor_id>" after the writer has committed;
+    listen() keeps a dedicated asyncpg connection (outside the SQLAlchemy pool)
+    subscribed to the channel and hands ids from other processes to on_change.
+    Notifications sent while the listener is disconnected are lost, so
+    on_reconnect is called after every reconnect to trigger a full reload.
+    """
+
+    def __init__(self, enabled: bool = CHANGE_FEED_ENABLED):
+        self.enabled = enabled
+        self.origin = uuid.uuid4().hex[:12]
+        self.connected = False
+        self._pending: set[asyncio.Task] = set()
+
+    def publish(self, monitor_id: uuid.UUID):
+        """Fire-and-forget NOTIFY; safe to call from synchronous code on the event loop."""
+        if not self.enabled:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._notify(monitor_id))
+        except RuntimeError:
+            return  # no running loop (e.g. scripts)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _notify(self, monitor_id: uuid.UUID):
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CHANNEL, "payload": f"{self.origin}:{monitor_id}"}
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not publish change for monitor {monitor_id}: {e}")
+
+    async def listen(self, on_change, on_reconnect):
+        """Runs until cancelled, reconnecting with backoff when the connection drops."""
+        if not self.enabled:
+            return
+        dsn = url_for_engine.replace("+asyncpg", "", 1)
+        delay = 1
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn, ssl=connect_args.get("ssl"))
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+
+                def handle(_connection, _pid, _channel, payload):
+                    origin, _, monitor_id = payload.partition(":")
+                    if origin == self.origin:
+                        return  # our own write, already applied locally
+                    try:
+                        on_change(uuid.UUID(monitor_id))
+                    except ValueError:
+                        logger.warning(f"Ignoring malformed change notification: {payload}")
+
+                await connection.add_listener(CHANNEL, handle)
+                self.connected = True
+                delay = 1
+                logger.info("Listening for monitor changes.")
+                if not first:
+                    on_reconnect()
+                first = False
+                await closed.wait()
+                logger.warning("Change feed connection closed.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed unavailable ({e}); retrying in {delay}s.")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    try:
+                        await connection.close(timeout=5)
+                    except Exception:
+                        connection.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+
+change_feed = MonitorChangeFeed()
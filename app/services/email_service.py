@@ -1,33 +1,123 @@
+import asyncio
 import httpx
-from app.config import BREVO_API_KEY, BREVO_SENDER_EMAIL
+from app.config import BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_API_URL, EMAIL_BATCH_WINDOW, EMAIL_BATCH_MAX
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def send_email(to_email: str, subject: str, html_content: str):
-    if not BREVO_API_KEY or not BREVO_SENDER_EMAIL:
-        logger.warning("Brevo credentials not found. Skipping email.")
-        return False
-        
-    url = "https://api.brevo.com/v3/smtp/email"
-    headers = {
-        "accept": "application/json",
-        "api-key": BREVO_API_KEY,
-        "content-type": "application/json"
-    }
-    
-    payload = {
-        "sender": {"email": BREVO_SENDER_EMAIL},
-        "to": [{"email": to_email}],
-        "subject": subject,
-        "htmlContent": html_content
-    }
-    
-    async with httpx.AsyncClient() as client:
+
+class BrevoMailer:
+    """
+    Sends transactional email through Brevo's API.
+
+    One long-lived httpx client is shared by every send, so connections to
+    Brevo stay warm instead of paying TCP + TLS per email. Alerts can be sent
+    in batch mode: emails requested within `batch_window` seconds of each other
+    are collected and posted as a single request, one `messageVersions` entry
+    per recipient (up to `batch_max` per request).
+
+    `base_url` and `transport` can point the mailer at a local stub server or an
+    httpx.MockTransport in tests and benchmarks.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = BREVO_API_KEY,
+        sender_email: str | None = BREVO_SENDER_EMAIL,
+        base_url: str = BREVO_API_URL,
+        transport: httpx.AsyncBaseTransport | None = None,
+        batch_window: float = EMAIL_BATCH_WINDOW,
+        batch_max: int = EMAIL_BATCH_MAX,
+    ):
+        self.api_key = api_key
+        self.sender_email = sender_email
+        self.base_url = base_url
+        self.transport = transport
+        self.batch_window = batch_window
+        self.batch_max = max(1, batch_max)
+
+        self._client: httpx.AsyncClient | None = None
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._window: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key and self.sender_email)
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"accept": "application/json", "api-key": self.api_key or "", "content-type": "application/json"},
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+                timeout=httpx.Timeout(15.0),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        # Let emails already waiting in a batch go out first
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def send(self, to_email: str, subject: str, html_content: str, batch: bool = False) -> bool:
+        if not self.configured:
+            logger.warning("Brevo credentials not found. Skipping email.")
+            return False
+
+        message = {"to": [{"email": to_email}], "subject": subject, "htmlContent": html_content}
+        if not batch or self.batch_window <= 0:
+            return await self._post({"sender": {"email": self.sender_email}, **message}, count=1)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((message, future))
+        if len(self._pending) >= self.batch_max:
+            full, self._pending = self._pending, []
+            self._track(asyncio.create_task(self._flush(full)))
+        elif self._window is None:
+            self._window = asyncio.create_task(self._close_window())
+            self._track(self._window)
+        return await future
+
+    # --- Batching ---
+
+    def _track(self, task: asyncio.Task):
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _close_window(self):
+        await asyncio.sleep(self.batch_window)
+        self._window = None
+        batch, self._pending = self._pending, []
+        await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]):
+        if not batch:
+            return
+        if len(batch) == 1:
+            payload = {"sender": {"email": self.sender_email}, **batch[0][0]}
+        else:
+            # Top-level subject/htmlContent are required; each version overrides them
+            first = batch[0][0]
+            payload = {
+                "sender": {"email": self.sender_email},
+                "subject": first["subject"],
+                "htmlContent": first["htmlContent"],
+                "messageVersions": [message for message, _ in batch],
+            }
+        sent = await self._post(payload, count=len(batch))
+        for _, future in batch:
+            if not future.done():
+                future.set_result(sent)
+
+    async def _post(self, payload: dict, count: int) -> bool:
         try:
-            response = await client.post(url, json=payload, headers=headers)
+            response = await self.get_client().post("/smtp/email", json=payload)
             if response.status_code in (200, 201, 202):
-                logger.info("Email sent to configured recipient")
+                logger.info("Email sent to %s configured recipient(s)", count)
                 return True
             else:
                 logger.error("Failed to send email via Brevo: status=%s", response.status_code)
@@ -35,3 +125,11 @@ async def send_email(to_email: str, subject: str, html_content: str):
         except Exception as e:
             logger.error("Exception sending email: %s", e)
             return False
+
+
+mailer = BrevoMailer()
+
+
+async def send_email(to_email: str, subject: str, html_content: str, batch: bool = False):
+    """Sends one email. With batch=True it may be grouped with others sent in the same window."""
+    return await mailer.send(to_email, subject, html_content, batch=batch)
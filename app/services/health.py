@@ -0,0 +1,49 @@
+from app.config import SCHEDULER_STALL_SECONDS, HEALTH_MAX_OVERDUE_SECONDS, HEALTH_MAX_WRITER_BACKLOG
+from app.services.scheduler import scheduler
+from app.services.result_writer import result_writer
+from app.services.watchdog import watchdog
+from app.bot import main as bot_main
+
+
+def health_report() -> dict:
+    """
+    Snapshot of the background machinery.
+
+    `alive` fails only when the scheduler is dead or stuck (restart the
+    process); `ready` additionally fails when checks are falling behind, results
+    are piling up or bot polling crashed.
+    """
+    heartbeat_age = scheduler.heartbeat_age()
+    overdue = scheduler.overdue_seconds()
+    backlog = result_writer.backlog
+
+    alive = watchdog.scheduler_running and (heartbeat_age is None or heartbeat_age <= SCHEDULER_STALL_SECONDS)
+    problems = []
+    if watchdog.stuck:
+        problems.append("scheduler stuck: ignored cancellation, no replacement started")
+    elif not alive:
+        problems.append("scheduler not running")
+    if overdue > HEALTH_MAX_OVERDUE_SECONDS:
+        problems.append(f"checks {overdue:.0f}s overdue")
+    if backlog > HEALTH_MAX_WRITER_BACKLOG:
+        problems.append(f"{backlog} results waiting to be written")
+    if bot_main.polling_status == "failed":
+        problems.append("bot polling failed")
+
+    return {
+        "status": "ok" if not problems else "degraded",
+        "alive": alive,
+        "ready": not problems,
+        "problems": problems,
+        "scheduler": {
+            "running": watchdog.scheduler_running,
+            "stuck": watchdog.stuck,
+            "heartbeat_age_seconds": round(heartbeat_age, 3) if heartbeat_age is not None else None,
+            "oldest_overdue_seconds": round(overdue, 3),
+            "restarts": watchdog.restarts,
+            "probe_queue_depth": scheduler.pipeline.queue_depth,
+            "probes_in_flight": scheduler.pipeline.in_flight,
+        },
+        "writer_backlog": backlog,
+        "bot_polling": bot_main.polling_status,
+    }
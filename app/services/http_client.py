@@ -0,0 +1,63 @@
+import httpx
+import logging
+from app.config import (
+    PROBE_MAX_CONNECTIONS,
+    PROBE_MAX_KEEPALIVE_CONNECTIONS,
+    PROBE_KEEPALIVE_EXPIRY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeClientPool:
+    """
+    Long-lived httpx clients shared by every monitor check.
+
+    Timeouts and redirect policy are applied per request, so only two clients
+    are needed: a keep-alive one (warm connections are reused across checks)
+    and a "cold" one that never keeps connections, for monitors that want
+    every check to pay DNS + TCP + TLS like a first-time visitor.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = PROBE_MAX_CONNECTIONS,
+        max_keepalive_connections: int = PROBE_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = PROBE_KEEPALIVE_EXPIRY,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+
+        self._warm_client: httpx.AsyncClient | None = None
+        self._cold_client: httpx.AsyncClient | None = None
+
+    def _build_client(self, keepalive: bool) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections if keepalive else 0,
+            keepalive_expiry=self.keepalive_expiry if keepalive else 0,
+        )
+        return httpx.AsyncClient(limits=limits, follow_redirects=True)
+
+    def get_client(self, fresh_connection: bool = False) -> httpx.AsyncClient:
+        """Returns the shared client, creating it lazily on first use."""
+        if fresh_connection:
+            if self._cold_client is None or self._cold_client.is_closed:
+                self._cold_client = self._build_client(keepalive=False)
+            return self._cold_client
+
+        if self._warm_client is None or self._warm_client.is_closed:
+            self._warm_client = self._build_client(keepalive=True)
+        return self._warm_client
+
+    async def aclose(self):
+        for client in (self._warm_client, self._cold_client):
+            if client is not None and not client.is_closed:
+                await client.aclose()
+        self._warm_client = None
+        self._cold_client = None
+        logger.info("Probe HTTP clients closed.")
+
+
+probe_pool = ProbeClientPool()
@@ -0,0 +1,100 @@
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Iterable
+
+# Supported MaintenanceWindow.recurrence values and their period in seconds
+RECURRENCE_PERIODS = {
+    "daily": 24 * 3600,
+    "weekly": 7 * 24 * 3600,
+}
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _merge(intervals: list[tuple[float, float]]) -> tuple[list[float], list[float]]:
+    """Sorts and merges overlapping intervals into parallel start/end lists."""
+    starts, ends = [], []
+    for start, end in sorted(intervals):
+        if starts and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+def _lookup(starts: list[float], ends: list[float], point: float) -> float | None:
+    """End of the interval containing point, or None."""
+    index = bisect_right(starts, point) - 1
+    if index >= 0 and point <= ends[index]:
+        return ends[index]
+    return None
+
+
+class MaintenanceSchedule:
+    """
+    A monitor's maintenance windows as merged, sorted intervals.
+
+    One-off windows live on an absolute timeline; recurring windows are folded
+    into offsets within their period (anchored on their first occurrence, UTC),
+    so "is now inside a window" is a binary search either way. A recurring
+    window never applies before its first occurrence. One-off windows that
+    already ended are dropped when the schedule is built.
+    """
+
+    __slots__ = ("_starts", "_ends", "_recurring")
+
+    def __init__(self, windows: Iterable = (), now: datetime | None = None):
+        now_ts = _timestamp(now or datetime.now(timezone.utc))
+        once: list[tuple[float, float]] = []
+        # (period, first start) -> offset intervals
+        recurring: dict[tuple[int, float], list[tuple[float, float]]] = {}
+
+        for window in windows:
+            start, end = _timestamp(window.start_time), _timestamp(window.end_time)
+            if end <= start:
+                continue
+            period = RECURRENCE_PERIODS.get(getattr(window, "recurrence", None) or "")
+            if period is None:
+                if end >= now_ts:
+                    once.append((start, end))
+                continue
+
+            offset, duration = start % period, min(end - start, period)
+            pieces = recurring.setdefault((period, start), [])
+            if offset + duration <= period:
+                pieces.append((offset, offset + duration))
+            else:
+                # Wraps around the period boundary
+                pieces.append((offset, period))
+                pieces.append((0.0, offset + duration - period))
+
+        self._starts, self._ends = _merge(once)
+        self._recurring = {key: _merge(pieces) for key, pieces in recurring.items()}
+
+    def __bool__(self) -> bool:
+        return bool(self._starts or self._recurring)
+
+    def window_end(self, when: datetime | None = None) -> datetime | None:
+        """If `when` (default now) falls inside a window, when that window ends; else None."""
+        point = _timestamp(when or datetime.now(timezone.utc))
+        latest = _lookup(self._starts, self._ends, point)
+
+        for (period, first_start), (starts, ends) in self._recurring.items():
+            if point < first_start:
+                continue  # not started recurring yet
+            offset_end = _lookup(starts, ends, point % period)
+            if offset_end is not None:
+                if offset_end >= period and starts[0] == 0:
+                    offset_end = period + ends[0]  # continues into the next period
+                end = point - (point % period) + offset_end
+                latest = end if latest is None else max(latest, end)
+
+        return datetime.fromtimestamp(latest, tz=timezone.utc) if latest is not None else None
+
+    def active(self, when: datetime | None = None) -> bool:
+        return self.window_end(when) is not None
@@ -0,0 +1,202 @@
+import asyncio
+import math
+from abc import ABC, abstractmethod
+import time
+from contextlib import contextmanager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond loop lag up to probe timeouts
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: dict | None = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        """Sample lines in the text exposition format."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """A gauge that is either set explicitly or read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} callback failed: {e}")
+                return []
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> ([count per bucket], sum, count)
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][index] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, {"le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics in the Prometheus text exposition format.
+    Everything runs on one event loop, so no locking is needed.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Checks and probes
+checks_total = registry.counter("uptime_checks_total", "Recorded check results.", ("result",))
+probe_duration = registry.histogram("uptime_probe_duration_seconds", "Duration of one probe attempt.", ("method", "outcome"))
+scheduler_lag = registry.histogram("uptime_scheduler_lag_seconds", "Delay between a monitor's due time and its dispatch.")
+probe_queue_depth = registry.gauge("uptime_probe_queue_depth", "Probe jobs waiting for a worker, including parked ones.")
+probes_in_flight = registry.gauge("uptime_probes_in_flight", "Probe jobs currently running.")
+
+# Overload handling
+scheduler_capacity = registry.gauge("uptime_scheduler_capacity_checks_per_second", "Estimated sustainable checks per second (after headroom).")
+scheduler_demand = registry.gauge("uptime_scheduler_demand_checks_per_second", "Checks per second the active monitors ask for.")
+scheduler_stretch = registry.gauge("uptime_scheduler_interval_stretch", "Interval multiplier applied while overloaded.", ("priority",))
+scheduler_overloaded = registry.gauge("uptime_scheduler_overloaded", "1 while demand exceeds capacity.")
+checks_skipped_maintenance_total = registry.counter("uptime_checks_skipped_maintenance_total", "Due checks skipped because the monitor was in a maintenance window.")
+checks_shed_total = registry.counter("uptime_checks_shed_total", "Checks skipped because they were a full interval late while overloaded.")
+
+# Result writer
+result_backlog = registry.gauge("uptime_result_writer_backlog", "Check results waiting to be flushed.")
+flush_size = registry.histogram("uptime_db_flush_size", "Check results per database flush.", buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000))
+flush_duration = registry.histogram("uptime_db_flush_duration_seconds", "Duration of a check result flush.", ("outcome",))
+
+# Notifications and bot
+notification_duration = registry.histogram("uptime_notification_duration_seconds", "Time to deliver a notification.", ("channel", "outcome"))
+notifications_total = registry.counter("uptime_notifications_total", "Outbox delivery attempts by result.", ("result",))
+telegram_send_backlog = registry.gauge("uptime_telegram_send_backlog", "Telegram messages waiting for their rate-limit slot.")
+telegram_send_duration = registry.histogram("uptime_telegram_send_duration_seconds", "Time of a single Telegram API send.", ("outcome",))
+telegram_throttled_total = registry.counter("uptime_telegram_throttled_total", "Telegram sends rejected with 429 and requeued.")
+bot_handler_duration = registry.histogram("uptime_bot_handler_duration_seconds", "Bot update handling time.", ("update_type",))
+
+# Event loop
+event_loop_lag = registry.histogram(
+    "uptime_event_loop_lag_seconds", "How late a periodic timer fires on the event loop.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+async def watch_event_loop_lag(interval: float = 0.5):
+    """Sleeps for `interval` in a loop and records how late each wake-up is."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - expected))
@@ -0,0 +1,131 @@
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy import or_
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from app.config import MONITOR_CACHE_TTL_SECONDS
+from app.database.connection import async_session
+from app.models import Monitor, MaintenanceWindow
+from app.services.maintenance import MaintenanceSchedule
+from app.services.status_tracker import status_tracker
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MonitorConfig:
+    """
+    Immutable copy of what the probe path needs from a Monitor. Attribute names
+    match the model, so check functions accept either; maintenance windows are
+    precompiled into a MaintenanceSchedule.
+    """
+    id: uuid.UUID
+    owner_id: uuid.UUID
+    url: str
+    name: str | None
+    interval_seconds: int
+    timeout_seconds: int
+    expected_status: int | None
+    is_notification_enabled: bool
+    check_ssl: bool
+    ssl_expiry_days_threshold: int
+    keyword_include: str | None
+    keyword_exclude: str | None
+    max_response_time: float | None
+    consecutive_checks: int
+    fresh_connection: bool
+    max_body_bytes: int | None
+    probe_method: str
+    last_status: bool | None
+    maintenance: MaintenanceSchedule
+
+    @classmethod
+    def from_model(cls, monitor: Monitor) -> "MonitorConfig":
+        return cls(
+            id=monitor.id,
+            owner_id=monitor.owner_id,
+            url=monitor.url,
+            name=monitor.name,
+            interval_seconds=monitor.interval_seconds,
+            timeout_seconds=monitor.timeout_seconds,
+            expected_status=monitor.expected_status,
+            is_notification_enabled=monitor.is_notification_enabled,
+            check_ssl=monitor.check_ssl,
+            ssl_expiry_days_threshold=monitor.ssl_expiry_days_threshold,
+            keyword_include=monitor.keyword_include,
+            keyword_exclude=monitor.keyword_exclude,
+            max_response_time=monitor.max_response_time,
+            consecutive_checks=monitor.consecutive_checks,
+            fresh_connection=bool(monitor.fresh_connection),
+            max_body_bytes=monitor.max_body_bytes,
+            probe_method=monitor.probe_method or "AUTO",
+            last_status=monitor.last_status,
+            maintenance=MaintenanceSchedule(monitor.maintenance_windows),
+        )
+
+
+class MonitorConfigCache:
+    """
+    Process-local cache of MonitorConfig snapshots for active monitors.
+
+    Entries are dropped by invalidate() (called through scheduler.invalidate
+    whenever the API or the bot writes a monitor) and expire after
+    `ttl_seconds` as a safety net for writes made elsewhere. Misses are loaded
+    in one query per batch, so in steady state dispatching a check needs no
+    database round trip.
+
+    Status is not cached here: snapshots keep the persisted last_status only as
+    a seed for the in-memory status_tracker.
+    """
+
+    def __init__(self, ttl_seconds: int = MONITOR_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[uuid.UUID, tuple[float, MonitorConfig]] = {}
+
+    def invalidate(self, monitor_id: uuid.UUID):
+        self._entries.pop(monitor_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_many(self, monitor_ids) -> list[MonitorConfig]:
+        """Snapshots of the given monitors that are still active; deleted or paused ones are left out."""
+        now = time.monotonic()
+        configs, missing = [], []
+        for monitor_id in monitor_ids:
+            entry = self._entries.get(monitor_id)
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                configs.append(entry[1])
+            else:
+                missing.append(monitor_id)
+
+        if missing:
+            async with async_session() as session:
+                # Windows that ended for good are never loaded
+                current_windows = Monitor.maintenance_windows.and_(or_(
+                    MaintenanceWindow.recurrence.is_not(None),
+                    MaintenanceWindow.end_time >= datetime.now(timezone.utc)
+                ))
+                stmt = select(Monitor).where(
+                    Monitor.id.in_(missing),
+                    Monitor.is_active == True
+                ).options(selectinload(current_windows))
+                result = await session.execute(stmt)
+                loaded = [MonitorConfig.from_model(monitor) for monitor in result.scalars().all()]
+
+            for config in loaded:
+                self._entries[config.id] = (now, config)
+                configs.append(config)
+
+            # Deleted or paused: forget them entirely
+            for monitor_id in set(missing) - {config.id for config in loaded}:
+                self._entries.pop(monitor_id, None)
+                status_tracker.forget(monitor_id)
+
+        return configs
+
+
+monitor_cache = MonitorConfigCache()
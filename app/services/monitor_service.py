@@ -1,184 +1,301 @@
 import asyncio
 import httpx
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone, timedelta
-from app.database.connection import async_session
-from app.models import Monitor, CheckLog
+from app.models import Monitor
+from app.services.result_writer import result_writer, CheckResult
+from app.services.http_client import probe_pool
+from app.services.ssl_service import get_ssl_expiry_days, remember_peer_certificate
+from app.services.body_scanner import KeywordScanner, scan_body
+from app.services.probe_timing import PhaseTimer, PhaseTimings
+from app.services import metrics
+from app.services.monitor_cache import MonitorConfig
+from app.services.status_tracker import status_tracker
+from app.services.maintenance import MaintenanceSchedule
+from app.config import PROBE_MAX_BODY_BYTES, CHECK_RETRY_DELAY, CHECK_RETRY_BACKOFF, CHECK_RETRY_MAX_DELAY
 import logging
 import socket
-import ssl
+import time
 from urllib.parse import urlparse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def get_ssl_expiry_days(url: str):
+def maintenance_schedule(monitor) -> MaintenanceSchedule:
+    """The monitor's precompiled schedule (cached snapshots) or one built from its eager-loaded windows."""
+    schedule = getattr(monitor, "maintenance", None)
+    if schedule is None:
+        schedule = MaintenanceSchedule(monitor.maintenance_windows or ())
+    return schedule
+
+
+def is_in_maintenance(monitor: Monitor) -> bool:
+    """Checks if the monitor is currently in a maintenance window (one-off or recurring)."""
+    return maintenance_schedule(monitor).active()
+
+PROBE_METHODS = ("AUTO", "GET", "HEAD", "RANGE", "TCP", "DNS")
+
+
+@dataclass
+class ProbeOutcome:
+    """What one probe attempt observed, before any monitor's own assertions are applied."""
+    method: str
+    status_code: int | None = None
+    response_time: float = 0
+    bytes_read: int = 0
+    truncated: bool = False
+    found_keywords: set[str] = field(default_factory=set)
+    error: str | None = None # Transport-level failure, the same for every monitor sharing the probe
+    retryable: bool = True
+    timings: PhaseTimings = field(default_factory=PhaseTimings)
+
+
+def resolve_probe_method(monitor: Monitor) -> str:
     """
-    Checks the SSL certificate expiry for the given URL.
-    Returns the number of days until expiry, or None if error/check inapplicable.
+    Picks the probe for a monitor. Keyword rules need the body, so they always use GET;
+    otherwise the configured method is used, and AUTO falls back to a cheap HEAD.
     """
-    try:
-        parsed = urlparse(url)
-        if parsed.scheme != 'https':
-            return None
-            
-        hostname = parsed.hostname
-        port = parsed.port or 443
-        
-        def _get_cert():
-            context = ssl.create_default_context()
-            with socket.create_connection((hostname, port), timeout=5) as sock:
-                with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                    return ssock.getpeercert()
-
-        # Run blocking socket op in thread pool
-        cert = await asyncio.to_thread(_get_cert)
-        
-        not_after_str = cert['notAfter']
-        # Format: 'May 26 23:59:59 2025 GMT'
-        expiry_date = datetime.strptime(not_after_str, '%b %d %H:%M:%S %Y %Z')
-        expiry_date = expiry_date.replace(tzinfo=timezone.utc)
-        
-        now = datetime.now(timezone.utc)
-        delta = expiry_date - now
-        return delta.days
-    except Exception as e:
-        logger.warning(f"SSL Check failed for {url}: {e}")
-        return None
+    if monitor.keyword_include or monitor.keyword_exclude:
+        return "GET"
+    method = (monitor.probe_method or "AUTO").upper()
+    return "HEAD" if method == "AUTO" else method
 
-def is_in_maintenance(monitor: Monitor) -> bool:
-    """Checks if the monitor is currently in a maintenance window."""
-    now = datetime.now(timezone.utc)
-    # We rely on eager loading or relationship access. 
-    # Note: monitor.maintenance_windows might need to be eager loaded in check_all_monitors
-    if not monitor.maintenance_windows:
-        return False
-        
-    for window in monitor.maintenance_windows:
-        if window.start_time <= now <= window.end_time:
-            return True
-    return False
-
-async def perform_pro_check(monitor: Monitor):
+
+def probe_key(monitor: Monitor) -> tuple:
     """
-    Performs the check logic including retries, keywords, etc.
-    Returns (status_code, response_time, is_up, error_message, extra_alerts)
+    Monitors with the same key send exactly the same request, so one probe can serve all of them.
+    Redirects are always followed, so the redirect policy does not need to be part of the key.
+    Monitors with keyword rules are only grouped with ones reading the same amount of body,
+    so none is judged on bytes past its own cap.
     """
-    retries = monitor.consecutive_checks if monitor.consecutive_checks > 0 else 1
-    
-    final_status_code = None
-    final_response_time = 0
-    final_is_up = False
-    final_error = None
-    extra_alerts = [] # List of strings like "High Latency", "SSL Expiring"
-
-    for attempt in range(retries):
-        try:
-            start_time = datetime.now(timezone.utc)
-            
-            async with httpx.AsyncClient(timeout=monitor.timeout_seconds, follow_redirects=True) as client:
-                response = await client.get(monitor.url)
-                
-                # Basic metrics
-                final_status_code = response.status_code
-                final_response_time = (datetime.now(timezone.utc) - start_time).total_seconds()
-                
-                # 1. Status Check
-                if monitor.expected_status:
-                    check_ok = (final_status_code == monitor.expected_status)
-                else:
-                    check_ok = (200 <= final_status_code < 300)
-                
-                if not check_ok:
-                    final_error = f"Unexpected Status: {final_status_code}"
-                    final_is_up = False
-                else:
-                    # 2. Keyword Check (Only if status is OK)
-                    text_body = response.text
-                    
-                    if monitor.keyword_include and monitor.keyword_include not in text_body:
-                        final_error = f"Missing Keyword: '{monitor.keyword_include}'"
-                        final_is_up = False
-                        check_ok = False # Fail this attempt
-                    
-                    elif monitor.keyword_exclude and monitor.keyword_exclude in text_body:
-                        final_error = f"Forbidden Keyword Found: '{monitor.keyword_exclude}'"
-                        final_is_up = False
-                        check_ok = False
-                    else:
-                        final_is_up = True
-                        final_error = None
-
-                # 3. Latency Check (Warning only, does not mark as DOWN unless it timed out which is caught elsewhere)
-                if final_is_up and monitor.max_response_time and final_response_time > monitor.max_response_time:
-                    extra_alerts.append(f"High Latency: {final_response_time:.2f}s > {monitor.max_response_time}s")
-
-            # If UP, break retry loop immediately
-            if final_is_up:
-                break
-            
-            # If failed, and we have retries left, wait a bit
-            if attempt < retries - 1:
-                await asyncio.sleep(2) # Wait 2 seconds before retry
-                
-        except httpx.RequestError as exc:
-            final_error = f"Request error: {exc}"
-            final_is_up = False
-            # continue retry
-            if attempt < retries - 1:
-                await asyncio.sleep(2)
-        except Exception as exc:
-            final_error = f"Unexpected error: {exc}"
-            final_is_up = False
-            break # Don't retry unexpected python errors usually
-
-    # 4. SSL Check (Once, if UP or even if DOWN usually good to check if requested)
-    # Perform outside retry loop to save time, or only if needed.
-    if monitor.check_ssl:
-        days_left = await get_ssl_expiry_days(monitor.url)
-        if days_left is not None and days_left < monitor.ssl_expiry_days_threshold:
-             extra_alerts.append(f"SSL Expiring in {days_left} days")
-
-    return final_status_code, final_response_time, final_is_up, final_error, extra_alerts
-
-
-async def check_single_monitor(monitor: Monitor, session):
+    body_cap = (monitor.max_body_bytes or PROBE_MAX_BODY_BYTES) if (monitor.keyword_include or monitor.keyword_exclude) else None
+    return (monitor.url, resolve_probe_method(monitor), monitor.timeout_seconds, bool(monitor.fresh_connection), body_cap)
+
+
+def _status_ok(monitor: Monitor, status_code: int, method: str) -> bool:
+    # A ranged GET answers 206 where the full GET would have answered 200
+    if method == "RANGE" and status_code == 206 and monitor.expected_status in (None, 200):
+        return True
+    if monitor.expected_status:
+        return status_code == monitor.expected_status
+    return 200 <= status_code < 300
+
+
+def _target(monitor: Monitor) -> tuple[str | None, int]:
+    parsed = urlparse(monitor.url)
+    return parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80)
+
+
+async def _probe_http(monitors: list[Monitor], method: str) -> ProbeOutcome:
     """
-    Checks a single monitor and updates its status and logs the check.
+    One HTTP attempt shared by every monitor in the group. The body is scanned
+    for the union of the group's keywords, and only if some monitor needs it.
     """
-    # 0. Maintenance Check
-    if is_in_maintenance(monitor):
-        # logger.info(f"Monitor {monitor.id} is in maintenance window. Skipping.")
-        return False # Or True? Skipping status update essentially.
+    monitor = monitors[0]
+    client = probe_pool.get_client(fresh_connection=monitor.fresh_connection)
 
-    url = monitor.url
-    
-    # Perform Checks
-    status_code, response_time, is_up, error_message, extra_alerts = await perform_pro_check(monitor)
-    
-    # Update monitor status
-    previous_status = monitor.last_status # This might be None initially
-    monitor.last_checked = datetime.now(timezone.utc)
-    monitor.last_status = is_up
+    includes = {m.keyword_include for m in monitors if m.keyword_include}
+    excludes = {m.keyword_exclude for m in monitors if m.keyword_exclude}
+    max_body_bytes = max((m.max_body_bytes or PROBE_MAX_BODY_BYTES) for m in monitors)
+
+    request_method, headers = method, None
+    if method == "RANGE":
+        request_method, headers = "GET", {"Range": "bytes=0-0"}
+
+    # Per-host limits are enforced by the probe pipeline before this runs
+    timer = PhaseTimer()
+    async with client.stream(
+        request_method, monitor.url, headers=headers, timeout=monitor.timeout_seconds,
+        extensions={"trace": timer.trace},
+    ) as response:
+        outcome = ProbeOutcome(method=method, status_code=response.status_code)
+
+        # Reuse this TLS handshake for the SSL expiry check
+        if any(m.check_ssl for m in monitors):
+            remember_peer_certificate(response, monitor.url)
+
+        # Some servers don't implement HEAD; retry those as a GET that stops after the headers
+        fallback = method == "HEAD" and response.status_code in (405, 501)
+
+        # Keyword Check (only read the body if a monitor with keywords accepted the status)
+        needs_body = method == "GET" and any(
+            (m.keyword_include or m.keyword_exclude) and _status_ok(m, response.status_code, method)
+            for m in monitors
+        )
+        if needs_body and not fallback:
+            scanner = KeywordScanner(includes | excludes, encoding=response.charset_encoding)
+
+            def is_decided():
+                # Absence of an exclude keyword can only be proven by reading everything
+                return scanner.done or (not excludes and includes <= scanner.found)
+
+            outcome.bytes_read, outcome.truncated = await scan_body(response, scanner, max_body_bytes, is_decided)
+            outcome.found_keywords = scanner.found
+
+        # Measured before the stream is closed so connection teardown isn't counted
+        timer.mark("body.complete")
+        outcome.response_time = timer.elapsed()
+        outcome.timings = timer.timings()
+
+    if fallback:
+        outcome = await _probe_http(monitors, "GET")
+        outcome.method = "HEAD"
+    return outcome
+
+
+async def _probe_tcp(monitor: Monitor) -> ProbeOutcome:
+    """Only opens (and closes) a TCP connection to the monitor's host and port."""
+    host, port = _target(monitor)
+    loop = asyncio.get_running_loop()
+    async with asyncio.timeout(monitor.timeout_seconds):
+        # Resolve separately so DNS and connect time can be told apart
+        start_time = loop.time()
+        addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        resolved_at = loop.time()
+        if not addresses:
+            raise OSError(f"no addresses for {host}")
+        _, writer = await asyncio.open_connection(addresses[0][4][0], port)
+        connected_at = loop.time()
+    outcome = ProbeOutcome(
+        method="TCP",
+        response_time=connected_at - start_time,
+        timings=PhaseTimings(dns_time=resolved_at - start_time, connect_time=connected_at - resolved_at),
+    )
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except Exception:
+        pass
+    return outcome
+
+
+async def _probe_dns(monitor: Monitor) -> ProbeOutcome:
+    """Only resolves the monitor's hostname."""
+    host, port = _target(monitor)
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    addresses = await asyncio.wait_for(
+        loop.getaddrinfo(host, port, type=socket.SOCK_STREAM),
+        timeout=monitor.timeout_seconds
+    )
+    elapsed = loop.time() - start_time
+    outcome = ProbeOutcome(method="DNS", response_time=elapsed, timings=PhaseTimings(dns_time=elapsed))
+    if not addresses:
+        outcome.error = f"DNS: no addresses for {host}"
+    return outcome
+
+
+async def probe_once(monitors: list[Monitor], method: str) -> ProbeOutcome:
+    """Runs a single attempt of the given probe method for a group of identical monitors."""
+    try:
+        if method == "TCP":
+            return await _probe_tcp(monitors[0])
+        if method == "DNS":
+            return await _probe_dns(monitors[0])
+        return await _probe_http(monitors, method)
+    except (httpx.RequestError, OSError) as exc:
+        # OSError covers TCP/DNS probes (refused, unreachable, resolution failures, timeouts)
+        return ProbeOutcome(method=method, error=f"Request error: {str(exc) or type(exc).__name__}")
+    except Exception as exc:
+        # Don't retry unexpected python errors usually
+        return ProbeOutcome(method=method, error=f"Unexpected error: {exc}", retryable=False)
+
+
+def evaluate(monitor: Monitor, outcome: ProbeOutcome) -> tuple[bool, str | None]:
+    """Applies one monitor's own assertions to a (possibly shared) probe outcome."""
+    if outcome.error:
+        return False, outcome.error
+    if outcome.method in ("TCP", "DNS"):
+        return True, None
+
+    # 1. Status Check
+    if not _status_ok(monitor, outcome.status_code, outcome.method):
+        return False, f"Unexpected Status: {outcome.status_code}"
+
+    # 2. Keyword Check
+    if monitor.keyword_include and monitor.keyword_include not in outcome.found_keywords:
+        error = f"Missing Keyword: '{monitor.keyword_include}'"
+        if outcome.truncated:
+            error += f" (in first {outcome.bytes_read} bytes)"
+        return False, error
+    if monitor.keyword_exclude and monitor.keyword_exclude in outcome.found_keywords:
+        return False, f"Forbidden Keyword Found: '{monitor.keyword_exclude}'"
+    return True, None
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait before confirmation attempt `attempt + 1`."""
+    return min(CHECK_RETRY_MAX_DELAY, CHECK_RETRY_DELAY * (CHECK_RETRY_BACKOFF ** (attempt - 1)))
+
+
+async def perform_pro_check(monitors: list[Monitor], attempts: dict | None = None):
+    """
+    Performs one attempt of the check logic (keywords, latency, SSL, etc.) for a
+    group of monitors sharing the same probe_key(). The single request's outcome
+    is evaluated against every monitor in the group.
+
+    `attempts` maps monitor ids to the attempt number being run (default 1).
+    Returns {monitor_id: (status_code, response_time, is_up, error_message, extra_alerts, bytes_read, timings)}
+    for monitors that reached a verdict; monitors that failed but still have
+    confirmation attempts left (consecutive_checks) are left out so the caller
+    can retry them later without holding a worker.
+    """
+    attempts = attempts or {}
+    method = resolve_probe_method(monitors[0])
+    started = time.perf_counter()
+    outcome = await probe_once(monitors, method)
+    metrics.probe_duration.observe(time.perf_counter() - started, method=method, outcome="error" if outcome.error else "ok")
+
+    final = {}
+    for monitor in monitors:
+        is_up, error = evaluate(monitor, outcome)
+        retries = monitor.consecutive_checks if monitor.consecutive_checks > 0 else 1
+        # Not UP yet but retries left: no verdict this time
+        if not is_up and outcome.retryable and attempts.get(monitor.id, 1) < retries:
+            continue
+
+        extra_alerts = [] # List of strings like "High Latency", "SSL Expiring"
+
+        # 3. Latency Check (Warning only, does not mark as DOWN unless it timed out which is caught elsewhere)
+        if is_up and monitor.max_response_time and outcome.response_time > monitor.max_response_time:
+            extra_alerts.append(f"High Latency: {outcome.response_time:.2f}s > {monitor.max_response_time}s")
+
+        # 4. SSL Check (cached per host, usually filled by the probe's own handshake)
+        if monitor.check_ssl:
+            days_left = await get_ssl_expiry_days(monitor.url)
+            if days_left is not None and days_left < monitor.ssl_expiry_days_threshold:
+                extra_alerts.append(f"SSL Expiring in {days_left} days")
+
+        final[monitor.id] = (outcome.status_code, outcome.response_time, is_up, error, extra_alerts, outcome.bytes_read, outcome.timings)
+    return final
+
+
+async def _record_result(monitor: Monitor | MonitorConfig, status_code, response_time, is_up, error_message, extra_alerts, bytes_read, timings):
+    # Update monitor state (kept in memory across checks; the DB row is written in batches)
+    checked_at = datetime.now(timezone.utc)
+    notice = status_tracker.observe(monitor.id, is_up, degraded=bool(extra_alerts), seed=monitor.last_status)
+    metrics.checks_total.inc(result="up" if is_up else "down")
     
-    # Log the check
-    check_log = CheckLog(
+    # Log the check (persisted by the result writer together with last_checked/last_status)
+    result_writer.submit(CheckResult(
         monitor_id=monitor.id,
+        checked_at=checked_at,
         status_code=status_code,
         response_time=response_time,
         is_up=is_up,
+        bytes_read=bytes_read,
+        **asdict(timings),
         error_message=f"{error_message} | {', '.join(extra_alerts)}" if extra_alerts and error_message else (error_message or ', '.join(extra_alerts)),
-        checked_at=datetime.now(timezone.utc) # explicit set
-    )
-    session.add(check_log)
+    ))
 
-    # Detect status change
-    if previous_status is not None and previous_status != is_up:
-        logger.info(f"Monitor {monitor.id} status changed: {previous_status} -> {is_up}")
-        from app.services.notification_service import send_notification
-        await send_notification(monitor, previous_status, is_up, error_message)
+    # Status change confirmed by the state machine (none while flapping)
+    if notice is not None:
+        logger.info(f"Monitor {monitor.id} status changed: {notice.previous_status} -> {notice.current_status}")
+        details = "; ".join(filter(None, (notice.summary, error_message)))
+        # Only queued here; delivery happens in the outbox dispatcher so slow channels never stall checks
+        from app.services.notification_outbox import notification_outbox
+        await notification_outbox.enqueue(monitor.id, notice.previous_status, notice.current_status, details or None, checked_at)
     
     # Send extra alerts (Stateless? Or only once? For now, let's send if they happen)
     # To avoid spamming latency alerts every minute, we ideally need state.
@@ -188,53 +305,43 @@ async def check_single_monitor(monitor: Monitor, session):
          # Check if we should throttle this? For now, just send distinct warning.
          pass 
 
-    return is_up
 
-async def check_all_monitors():
+async def check_monitor_group(monitors: list[Monitor], attempts: dict | None = None) -> dict:
+    """
+    Runs one attempt for monitors sharing one probe_key() with a single request,
+    then updates each decided monitor's in-memory status and queues its result
+    for the batched writer.
+    Returns {monitor_id: is_up} for decided monitors and {monitor_id: None} for
+    monitors that need another confirmation attempt. Monitors in maintenance are omitted.
+    """
+    # 0. Maintenance Check
+    active = [monitor for monitor in monitors if not is_in_maintenance(monitor)]
+    if not active:
+        return {}
+
+    # Perform Checks
+    results = await perform_pro_check(active, attempts)
+    for monitor in active:
+        if monitor.id in results:
+            await _record_result(monitor, *results[monitor.id])
+
+    if len(active) > 1:
+        logger.debug(f"Coalesced {len(active)} monitors into one probe of {active[0].url}")
+    return {monitor.id: results[monitor.id][2] if monitor.id in results else None for monitor in active}
+
+
+async def check_single_monitor(monitor: Monitor):
     """
-    Retrieves all active monitors and checks them.
-    This function handles its own database session.
+    Checks a single monitor right now (e.g. the bot's "Check Now"). The caller
+    waits for the verdict anyway, so confirmation retries happen inline here;
+    the scheduler re-enqueues them as delayed events instead.
     """
-    async with async_session() as session:
-        try:
-            # Fetch active monitors, eagerly loading owner and maintenance windows
-            stmt = select(Monitor).where(Monitor.is_active == True).options(
-                selectinload(Monitor.owner),
-                selectinload(Monitor.maintenance_windows)
-            )
-            result = await session.execute(stmt)
-            monitors = result.scalars().all()
-            
-            if not monitors:
-                # logger.debug("No active monitors found.")
-                return
-
-            tasks = []
-            for monitor in monitors:
-                # Basic interval check logic
-                should_check = True
-                if monitor.last_checked:
-                    # ensure both are aware or both naive
-                    last_checked = monitor.last_checked
-                    if last_checked.tzinfo is None:
-                         last_checked = last_checked.replace(tzinfo=timezone.utc)
-                    
-                    now = datetime.now(timezone.utc)
-                    delta = (now - last_checked).total_seconds()
-                    
-                    if delta < monitor.interval_seconds:
-                        should_check = False
-                
-                if should_check:
-                    tasks.append(check_single_monitor(monitor, session))
-            
-            if tasks:
-                await asyncio.gather(*tasks)
-                await session.commit()
-                logger.info(f"Checked {len(tasks)} monitors.")
-            else:
-                logger.debug("No monitors due for checking.")
-
-        except Exception as e:
-            logger.error(f"Error during monitoring cycle: {e}")
-            await session.rollback()
+    attempt = 1
+    while True:
+        results = await check_monitor_group([monitor], {monitor.id: attempt})
+        if monitor.id not in results:
+            return False # Skipped (maintenance) counts as not confirmed UP
+        if results[monitor.id] is not None:
+            return results[monitor.id]
+        await asyncio.sleep(retry_delay(attempt))
+        attempt += 1
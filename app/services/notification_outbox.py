@@ -0,0 +1,242 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from app.config import (
+    OUTBOX_POLL_SECONDS, OUTBOX_BATCH_SIZE, OUTBOX_CONCURRENCY,
+    OUTBOX_MAX_ATTEMPTS, OUTBOX_LEASE_SECONDS,
+    NOTIFY_DIGEST_WINDOW, NOTIFY_IMMEDIATE_FIRST,
+)
+from app.database.connection import async_session
+from app.models import Monitor, NotificationOutbox
+from app.services import metrics
+from app.services.notification_service import send_notification, send_digest, StatusChange, CHANNELS
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDispatcher:
+    """
+    Delivers status-change notifications from the notification_outbox table.
+
+    The check path only inserts a row (enqueue) and moves on; this task claims
+    due rows with SELECT ... FOR UPDATE SKIP LOCKED, so several processes can
+    dispatch without sending the same row twice. A claim pushes next_attempt_at
+    out by `lease_seconds`; if the process dies mid-send the lease expires and
+    another dispatcher retries the row. Channels that already succeeded are
+    recorded on the row and skipped on retry. Failures back off exponentially
+    until `max_attempts`, after which the row is marked failed.
+
+    During correlated outages alerts are coalesced per user: a status change
+    that follows another one of the same user's within `digest_window` seconds
+    is held until that window closes, and everything due for one user at the
+    same time goes out as a single digest message and email. With
+    `immediate_first`, the first change after a quiet period is never held.
+    """
+
+    def __init__(
+        self,
+        poll_seconds: float = OUTBOX_POLL_SECONDS,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        concurrency: int = OUTBOX_CONCURRENCY,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        lease_seconds: int = OUTBOX_LEASE_SECONDS,
+        digest_window: float = NOTIFY_DIGEST_WINDOW,
+        immediate_first: bool = NOTIFY_IMMEDIATE_FIRST,
+    ):
+        self.poll_seconds = poll_seconds
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.digest_window = digest_window
+        self.immediate_first = immediate_first
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        # Status changes whose insert failed; retried by the dispatcher loop so none are lost
+        self._unsaved: list[dict] = []
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Rows claimed but not finished are picked up again once their lease expires
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._save_unsaved()
+
+    async def enqueue(self, monitor_id: uuid.UUID, previous_status: bool | None, current_status: bool, error_details: str | None, occurred_at: datetime):
+        """Durably records a status change for delivery. Duplicate transitions are ignored."""
+        change = {
+            "idempotency_key": f"{monitor_id}:{occurred_at.isoformat()}:{'up' if current_status else 'down'}",
+            "monitor_id": monitor_id,
+            "previous_status": previous_status,
+            "current_status": current_status,
+            "error_details": error_details,
+            "occurred_at": occurred_at,
+        }
+        try:
+            await self._insert(change)
+        except Exception as e:
+            # The status tracker already considers this change notified, so keep it until it is stored
+            logger.error(f"Could not queue notification for monitor {monitor_id}, will retry: {e}")
+            self._unsaved.append(change)
+
+    async def _insert(self, change: dict):
+        async with async_session() as session:
+            hold_until = await self._hold_until(session, change["monitor_id"])
+            await session.execute(
+                insert(NotificationOutbox).values(
+                    id=uuid.uuid4(),
+                    next_attempt_at=hold_until or func.now(),
+                    **change,
+                ).on_conflict_do_nothing(index_elements=[NotificationOutbox.idempotency_key])
+            )
+            await session.commit()
+        if hold_until is None:
+            self._wakeup.set()
+
+    async def _save_unsaved(self):
+        while self._unsaved:
+            try:
+                await self._insert(self._unsaved[0])
+            except Exception as e:
+                logger.error(f"Still cannot queue {len(self._unsaved)} notification(s): {e}")
+                return
+            self._unsaved.pop(0)
+
+    async def _hold_until(self, session, monitor_id: uuid.UUID) -> datetime | None:
+        """When a new change for this monitor's owner should go out; None means now."""
+        if self.digest_window <= 0:
+            return None
+        now = datetime.now(timezone.utc)
+        owner_id = select(Monitor.owner_id).where(Monitor.id == monitor_id).scalar_subquery()
+        recent = (await session.execute(
+            select(NotificationOutbox.status, NotificationOutbox.attempts, NotificationOutbox.next_attempt_at)
+            .join(Monitor, Monitor.id == NotificationOutbox.monitor_id)
+            .where(Monitor.owner_id == owner_id, NotificationOutbox.created_at > now - timedelta(seconds=self.digest_window))
+        )).all()
+
+        # Join a digest that is already being held (never claimed, due later)
+        held = [due for status, attempts, due in recent if status == "pending" and attempts == 0 and due > now]
+        if held:
+            return min(held)
+        if not recent and self.immediate_first:
+            return None
+        return now + timedelta(seconds=self.digest_window)
+
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        return timedelta(seconds=min(600, 5 * 2 ** (attempts - 1)))
+
+    async def _claim(self) -> list[NotificationOutbox]:
+        async with async_session() as session:
+            stmt = (
+                select(NotificationOutbox)
+                .where(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= func.now())
+                .order_by(NotificationOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = (await session.execute(stmt)).scalars().all()
+            lease_until = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+            for row in rows:
+                row.attempts += 1
+                row.next_attempt_at = lease_until
+            await session.commit()
+        return rows
+
+    async def _deliver(self, entries: list[NotificationOutbox], monitors: dict[uuid.UUID, Monitor]):
+        """Delivers one user's due rows: a single notification, or a digest when there are several."""
+        async with self._slots:
+            # A channel only counts as delivered if it reached the user for every row
+            delivered = set.intersection(*(set(filter(None, entry.delivered_channels.split(","))) for entry in entries))
+            changes = [
+                StatusChange(monitors[entry.monitor_id], entry.previous_status, entry.current_status, entry.error_details, entry.occurred_at)
+                for entry in entries if entry.monitor_id in monitors
+            ]
+            error = None
+            try:
+                if not changes:
+                    delivered = set(CHANNELS)  # deleted; the rows go with them via cascade anyway
+                elif len(changes) == 1:
+                    change = changes[0]
+                    delivered = await send_notification(
+                        change.monitor, change.previous_status, change.current_status, change.error_details,
+                        occurred_at=change.occurred_at, skip_channels=delivered,
+                    )
+                else:
+                    delivered = await send_digest(changes[0].monitor.owner_id, changes, skip_channels=delivered)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+            async with async_session() as session:
+                for entry in entries:
+                    await session.execute(
+                        update(NotificationOutbox).where(NotificationOutbox.id == entry.id).values(**self._outcome(entry, delivered, error))
+                    )
+                await session.commit()
+
+    def _outcome(self, entry: NotificationOutbox, delivered: set[str], error: str | None) -> dict:
+        values = {"delivered_channels": ",".join(sorted(delivered))}
+        if set(CHANNELS) <= delivered:
+            values.update(status="sent", sent_at=func.now(), last_error=None)
+            metrics.notifications_total.inc(result="sent")
+        else:
+            values["last_error"] = error or f"undelivered: {', '.join(sorted(set(CHANNELS) - delivered))}"
+            if entry.attempts >= self.max_attempts:
+                values["status"] = "failed"
+                metrics.notifications_total.inc(result="failed")
+                logger.error(f"Giving up on notification {entry.id} after {entry.attempts} attempts: {values['last_error']}")
+            else:
+                values["next_attempt_at"] = datetime.now(timezone.utc) + self.backoff(entry.attempts)
+                metrics.notifications_total.inc(result="retry")
+        return values
+
+    @staticmethod
+    async def _group_by_owner(rows: list[NotificationOutbox]) -> list[tuple[list[NotificationOutbox], dict]]:
+        async with async_session() as session:
+            monitors = {
+                monitor.id: monitor
+                for monitor in (await session.execute(
+                    select(Monitor).where(Monitor.id.in_({row.monitor_id for row in rows}))
+                )).scalars().all()
+            }
+        groups: dict = defaultdict(list)
+        for row in rows:
+            monitor = monitors.get(row.monitor_id)
+            groups[monitor.owner_id if monitor else row.monitor_id].append(row)
+        return [(entries, monitors) for entries in groups.values()]
+
+    async def _run(self):
+        while True:
+            await self._save_unsaved()
+            try:
+                rows = await self._claim()
+                if rows:
+                    groups = await self._group_by_owner(rows)
+                    await asyncio.gather(*(self._deliver(entries, monitors) for entries, monitors in groups), return_exceptions=True)
+                    if len(rows) == self.batch_size:
+                        continue  # more may be due right away
+            except Exception as e:
+                logger.error(f"Error in notification dispatcher: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+notification_outbox = NotificationDispatcher()
@@ -1,102 +1,221 @@
-from app.models import Monitor
+from sqlalchemy import update
+from app.models import Monitor, User
 from app.bot.loader import bot
+from app.bot.sender import telegram_sender, PRIORITY_ALERT
 from app.services.email_service import send_email
 from app.database.connection import async_session
-from app.config import BOT_USERNAME
+from app.config import BOT_USERNAME, BREVO_API_KEY, BREVO_SENDER_EMAIL
+from app.services import metrics
+from dataclasses import dataclass
 from datetime import datetime, timezone
 import logging
+import time
 from telebot import types
 
 logger = logging.getLogger(__name__)
 
-async def send_notification(monitor: Monitor, previous_status: bool, current_status: bool, error_details: str = None):
+CHANNELS = ("telegram", "email")
+
+
+@dataclass
+class StatusChange:
+    monitor: Monitor
+    previous_status: bool | None
+    current_status: bool
+    error_details: str | None
+    occurred_at: datetime
+
+
+async def send_notification(
+    monitor: Monitor,
+    previous_status: bool,
+    current_status: bool,
+    error_details: str = None,
+    occurred_at: datetime | None = None,
+    skip_channels: set[str] = frozenset(),
+) -> set[str]:
     """
     Sends a notification via Telegram and Email about the status change.
+    The owner is read fresh here so notification and email settings are always current.
+
+    Returns the channels that are done with: delivered, or deliberately not
+    used (no bot, email disabled, daily limit reached). Channels in
+    `skip_channels` were delivered by an earlier attempt and are not sent again.
     """
-    if not bot:
-        logger.warning("Bot is not initialized. Skipping notification.")
-        return
+    occurred_at = occurred_at or datetime.now(timezone.utc)
+    done = set(skip_channels)
 
-    user = monitor.owner
+    async with async_session() as session:
+        user = await session.get(User, monitor.owner_id)
     if not user:
         logger.warning(f"Monitor {monitor.id} has no owner. Skipping.")
-        return
+        return set(CHANNELS)
+
+    if "telegram" not in done and await _send_telegram(user, _telegram_text(monitor, previous_status, current_status, error_details, occurred_at)):
+        done.add("telegram")
+    if "email" not in done:
+        status_str = "UP 🟢" if current_status else "DOWN 🔴"
+        prev_str = "UP" if previous_status else "DOWN"
+        subject = f"Monitor Alert: {monitor.name} is {prev_str} -> {status_str.split()[0]}"
+        if await _send_email(user, subject, _email_html(monitor, current_status, error_details, occurred_at)):
+            done.add("email")
+    return done
+
+
+async def send_digest(owner_id, changes: list[StatusChange], skip_channels: set[str] = frozenset()) -> set[str]:
+    """
+    Sends one Telegram message and one email listing several status changes of
+    the same user's monitors (oldest first). Returns the channels that are done
+    with, like send_notification.
+    """
+    done = set(skip_channels)
+
+    async with async_session() as session:
+        user = await session.get(User, owner_id)
+    if not user:
+        logger.warning(f"User {owner_id} not found. Skipping digest.")
+        return set(CHANNELS)
 
+    changes = sorted(changes, key=lambda change: change.occurred_at)
+    down = sum(1 for change in changes if not change.current_status)
+    summary = f"{len(changes)} monitors changed status ({down} down, {len(changes) - down} up)"
+
+    if "telegram" not in done:
+        lines = [f"📋 {summary}\n"]
+        for change in changes:
+            emoji = "✅" if change.current_status else "🚨"
+            line = f"{emoji} {change.monitor.name or 'Unnamed'} ({change.monitor.url}) {'UP' if change.current_status else 'DOWN'} at {change.occurred_at.strftime('%H:%M:%S UTC')}"
+            if change.error_details:
+                line += f"\n    {'Note' if change.current_status else 'Error'}: {change.error_details}"
+            lines.append(line)
+        if await _send_telegram(user, "\n".join(lines)):
+            done.add("telegram")
+
+    if "email" not in done:
+        html = f'<h2>{summary.capitalize()}</h2>' + "".join(
+            _email_html(change.monitor, change.current_status, change.error_details, change.occurred_at, heading=False)
+            for change in changes
+        )
+        if await _send_email(user, f"Monitor Alert: {summary}", html):
+            done.add("email")
+    return done
+
+
+def _telegram_text(monitor, previous_status, current_status, error_details, occurred_at) -> str:
     status_str = "UP 🟢" if current_status else "DOWN 🔴"
     prev_str = "UP" if previous_status else "DOWN"
     
     emoji = "✅" if current_status else "🚨"
     
     error_section = ""
-    if error_details and not current_status:
-        error_section = f"\nError: {error_details}\n"
+    if error_details:
+        error_section = f"\n{'Note' if current_status else 'Error'}: {error_details}\n"
 
-    button_url = f"https://t.me/{BOT_USERNAME}?start=start" if BOT_USERNAME else "https://t.me/"
-
-    message = (
+    return (
         f"{emoji} Monitor Status Change\n\n"
         f"Name: {monitor.name or 'Unnamed'}\n"
         f"URL: {monitor.url}\n"
         f"Status: {prev_str} -> {status_str}\n"
         f"{error_section}"
-        f"Time: {monitor.last_checked.strftime('%Y-%m-%d %H:%M:%S UTC')}"
+        f"Time: {occurred_at.strftime('%Y-%m-%d %H:%M:%S UTC')}"
     )
 
+
+async def _send_telegram(user: User, message: str) -> bool:
+    if not bot:
+        logger.warning("Bot is not initialized. Skipping notification.")
+        return True
+
+    button_url = f"https://t.me/{BOT_USERNAME}?start=start" if BOT_USERNAME else "https://t.me/"
+
+    started = time.perf_counter()
     try:
         reply_markup = types.InlineKeyboardMarkup()
         reply_markup.add(types.InlineKeyboardButton("Open Bot", url=button_url))
-        await bot.send_message(
-            chat_id=user.telegram_id,
+        await telegram_sender.send(
+            user.telegram_id,
             text=message,
             reply_markup=reply_markup,
-            disable_web_page_preview=True
+            disable_web_page_preview=True,
+            priority=PRIORITY_ALERT
         )
-        logger.info(f"Notification sent to {user.telegram_id} for monitor {monitor.id}")
+        metrics.notification_duration.observe(time.perf_counter() - started, channel="telegram", outcome="ok")
+        logger.info(f"Notification sent to {user.telegram_id}")
+        return True
     except Exception as e:
+        metrics.notification_duration.observe(time.perf_counter() - started, channel="telegram", outcome="error")
         logger.error(f"Failed to send notification to {user.telegram_id}: {e}")
+        return False
+
+
+def _email_html(monitor, current_status, error_details, occurred_at, heading: bool = True) -> str:
+    status_str = "UP 🟢" if current_status else "DOWN 🔴"
+    bg_color = "#d4edda" if current_status else "#f8d7da"
+    text_color = "#155724" if current_status else "#721c24"
+
+    return f"""
+        {f'<h2 style="color: {text_color};">Monitor Status Change</h2>' if heading else ''}
+        <p><strong>Monitor:</strong> {monitor.name or 'Unnamed'}</p>
+        <p><strong>URL:</strong> <a href="{monitor.url}">{monitor.url}</a></p>
+        <p style="background-color: {bg_color}; padding: 10px; border-radius: 3px; color: {text_color};">
+            <strong>Status:</strong> {status_str}
+        </p>
+        {f'<p><strong>{"Note" if current_status else "Error"}:</strong> ' + error_details + '</p>' if error_details else ''}
+        <p>Time: {occurred_at.strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
+    """
+
 
+async def _send_email(user: User, subject: str, content_html: str) -> bool:
     # --- Email Notification Logic ---
-    if user.is_email_notification_enabled and user.email:
-        # Check rate limits
-        now = datetime.now(timezone.utc)
-        
-        # Reset if day changed
-        if user.last_email_notification_date:
-            if user.last_email_notification_date.date() < now.date():
-                user.email_notification_count = 0
-        
-        limit = getattr(user, 'email_limit', 10) # Default to 10
-        
-        if user.email_notification_count < limit:
-            # Send Email
-            # Construct HTML
-            bg_color = "#d4edda" if current_status else "#f8d7da"
-            text_color = "#155724" if current_status else "#721c24"
-            
-            html_body = f"""
-            <div style="font-family: Arial, sans-serif; padding: 20px; border: 1px solid #ddd; border-radius: 5px;">
-                <h2 style="color: {text_color};">Monitor Status Change</h2>
-                <p><strong>Monitor:</strong> {monitor.name or 'Unnamed'}</p>
-                <p><strong>URL:</strong> <a href="{monitor.url}">{monitor.url}</a></p>
-                <p style="background-color: {bg_color}; padding: 10px; border-radius: 3px; color: {text_color};">
-                    <strong>Status:</strong> {status_str}
-                </p>
-                {'<p><strong>Error:</strong> ' + error_details + '</p>' if error_details and not current_status else ''}
-                <p>Time: {now.strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
-                <hr>
-                <p style="font-size: 12px; color: #888;">You are receiving this because you enabled email notifications. (Limit: {limit}/day)</p>
-            </div>
-            """
-            
-            email_sent = await send_email(
-                to_email=user.email,
-                subject=f"Monitor Alert: {monitor.name} is {prev_str} -> {status_str.split()[0]}",
-                html_content=html_body
+    if not (user.is_email_notification_enabled and user.email):
+        return True
+    if not BREVO_API_KEY or not BREVO_SENDER_EMAIL:
+        return True # Not configured; retrying wouldn't help
+
+    # Check rate limits
+    now = datetime.now(timezone.utc)
+    
+    # Reset if day changed
+    if user.last_email_notification_date:
+        if user.last_email_notification_date.date() < now.date():
+            user.email_notification_count = 0
+    
+    limit = getattr(user, 'email_limit', 10) # Default to 10
+    
+    if user.email_notification_count >= limit:
+        logger.info(f"Email limit reached for {user.email} ({user.email_notification_count}/{limit}). Skipping.")
+        return True
+
+    # Send Email
+    html_body = f"""
+    <div style="font-family: Arial, sans-serif; padding: 20px; border: 1px solid #ddd; border-radius: 5px;">
+        {content_html}
+        <hr>
+        <p style="font-size: 12px; color: #888;">You are receiving this because you enabled email notifications. (Limit: {limit}/day)</p>
+    </div>
+    """
+    
+    started = time.perf_counter()
+    email_sent = await send_email(
+        to_email=user.email,
+        subject=subject,
+        html_content=html_body,
+        batch=True
+    )
+    metrics.notification_duration.observe(time.perf_counter() - started, channel="email", outcome="ok" if email_sent else "error")
+    if not email_sent:
+        return False
+
+    user.email_notification_count += 1
+    user.last_email_notification_date = now
+    # The user was loaded in a closed session, so persist the quota explicitly
+    async with async_session() as session:
+        await session.execute(
+            update(User).where(User.id == user.id).values(
+                email_notification_count=user.email_notification_count,
+                last_email_notification_date=now
             )
-            
-            if email_sent:
-                user.email_notification_count += 1
-                user.last_email_notification_date = now
-                logger.info(f"Email sent to {user.email}. Count today: {user.email_notification_count}")
-        else:
-            logger.info(f"Email limit reached for {user.email} ({user.email_notification_count}/{limit}). Skipping.")
+        )
+        await session.commit()
+    logger.info(f"Email sent to {user.email}. Count today: {user.email_notification_count}")
+    return True
@@ -0,0 +1,125 @@
+import asyncio
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+from app.config import CHECK_CONCURRENCY, CHECK_CONCURRENCY_PER_HOST
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProbePipeline:
+    """
+    Fixed pool of workers draining a queue of probe jobs. A job is a group of
+    due monitors that share the same request (see monitor_service.probe_key).
+
+    At most `concurrency` checks run at once, and at most `per_host` of them
+    against the same hostname. A job whose host is saturated is parked instead
+    of blocking its worker, and goes back on the queue when a check against that
+    host finishes. Under load, checks therefore run slightly late rather than
+    opening thousands of sockets at once.
+    """
+
+    def __init__(self, handler, concurrency: int = CHECK_CONCURRENCY, per_host: int = CHECK_CONCURRENCY_PER_HOST):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.per_host = per_host
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._parked: dict[str, deque] = defaultdict(deque)
+        self._host_active: dict[str, int] = defaultdict(int)
+        self._workers: list[asyncio.Task] = []
+        self.in_flight = 0
+        self.avg_job_seconds: float | None = None  # EWMA of handler duration
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        logger.info(f"Probe pipeline started with {self.concurrency} workers ({self.per_host} per host).")
+
+    async def stop(self):
+        """Cancels the workers and drops queued jobs, so a restarted pipeline starts empty."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = asyncio.Queue()
+        self._parked.clear()
+        self._host_active.clear()
+        self.in_flight = 0
+
+    def submit(self, monitors, on_done, attempts: dict | None = None):
+        """
+        Queues a group check. on_done(result) is called with the handler's return
+        value once the check has finished, or with None if it raised.
+        """
+        self._queue.put_nowait((monitors, on_done, attempts))
+
+    @property
+    def queue_depth(self) -> int:
+        """Checks waiting for a worker, including those parked behind a busy host."""
+        return self._queue.qsize() + sum(len(jobs) for jobs in self._parked.values())
+
+    def capacity(self) -> float | None:
+        """Jobs per second the workers can sustain at the recent job duration (None until measured)."""
+        if not self.avg_job_seconds:
+            return None
+        return self.concurrency / self.avg_job_seconds
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "in_flight": self.in_flight,
+            "queued": self._queue.qsize(),
+            "parked": sum(len(jobs) for jobs in self._parked.values()),
+        }
+
+    # --- Per-host accounting ---
+
+    def _try_acquire_host(self, host: str | None) -> bool:
+        if not host or self.per_host <= 0:
+            return True
+        if self._host_active[host] >= self.per_host:
+            return False
+        self._host_active[host] += 1
+        return True
+
+    def _release_host(self, host: str | None):
+        if not host or self.per_host <= 0:
+            return
+        self._host_active[host] -= 1
+        if self._host_active[host] <= 0:
+            del self._host_active[host]
+
+        parked = self._parked.get(host)
+        if parked:
+            self._queue.put_nowait(parked.popleft())
+            if not parked:
+                del self._parked[host]
+
+    # --- Workers ---
+
+    async def _worker(self):
+        while True:
+            monitors, on_done, attempts = await self._queue.get()
+            host = urlparse(monitors[0].url).hostname
+
+            if not self._try_acquire_host(host):
+                self._parked[host].append((monitors, on_done, attempts))
+                self._queue.task_done()
+                continue
+
+            self.in_flight += 1
+            result = None
+            started = asyncio.get_running_loop().time()
+            try:
+                result = await self.handler(monitors, attempts)
+            except Exception as e:
+                logger.error(f"Error in probe worker for {monitors[0].url}: {e}")
+            finally:
+                elapsed = asyncio.get_running_loop().time() - started
+                self.avg_job_seconds = elapsed if self.avg_job_seconds is None else 0.9 * self.avg_job_seconds + 0.1 * elapsed
+                self.in_flight -= 1
+                self._release_host(host)
+                self._queue.task_done()
+                on_done(result)
@@ -0,0 +1,56 @@
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class PhaseTimings:
+    """
+    Seconds spent in each phase of one probe. A phase the probe didn't go
+    through (no new connection, plain HTTP, HEAD without a body...) stays None.
+    For HTTP probes name resolution is part of connect_time.
+    """
+    dns_time: float | None = None
+    connect_time: float | None = None
+    tls_time: float | None = None
+    ttfb: float | None = None
+    transfer_time: float | None = None
+
+
+class PhaseTimer:
+    """
+    Collects monotonic timestamps from httpcore trace events for one request.
+
+    Pass `timer.trace` as the request's "trace" extension; the callback only
+    stores a perf_counter() reading per event, so it adds next to nothing to
+    what it measures. Works for HTTP/1.1 and HTTP/2 connections alike.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._marks: dict[str, float] = {}
+
+    async def trace(self, event_name: str, info: dict):
+        # e.g. "connection.start_tls.complete" or "http11.receive_response_headers.started"
+        prefix, _, step = event_name.partition(".")
+        if prefix in ("http11", "http2"):
+            prefix = "http"
+        self._marks.setdefault(f"{prefix}.{step}", time.perf_counter())
+
+    def mark(self, name: str):
+        self._marks.setdefault(name, time.perf_counter())
+
+    def _between(self, start: str, end: str) -> float | None:
+        if start in self._marks and end in self._marks:
+            return self._marks[end] - self._marks[start]
+        return None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def timings(self) -> PhaseTimings:
+        return PhaseTimings(
+            connect_time=self._between("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+            tls_time=self._between("connection.start_tls.started", "connection.start_tls.complete"),
+            ttfb=self._between("http.send_request_headers.started", "http.receive_response_headers.complete"),
+            transfer_time=self._between("http.receive_response_headers.complete", "body.complete"),
+        )
@@ -0,0 +1,158 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from sqlalchemy import DateTime, bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.config import RESULT_BATCH_SIZE, RESULT_FLUSH_INTERVAL
+from app.database.connection import async_session
+from app.models import CheckLog, Monitor
+from app.services import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckResult:
+    monitor_id: uuid.UUID
+    checked_at: datetime
+    status_code: int | None
+    response_time: float | None
+    is_up: bool
+    error_message: str | None
+    bytes_read: int | None = None
+    dns_time: float | None = None
+    connect_time: float | None = None
+    tls_time: float | None = None
+    ttfb: float | None = None
+    transfer_time: float | None = None
+
+
+class CheckResultWriter:
+    """
+    Persists check results in batches.
+
+    Probes submit results to an in-memory queue and return immediately; a single
+    writer task flushes them when `batch_size` results are pending or
+    `flush_interval` seconds have passed since the first one arrived. Each flush
+    is one multi-row INSERT into checks plus one executemany UPDATE of
+    monitors.last_checked/last_status, in a single transaction. next_check_at
+    is owned by the scheduler, which persists its planned due times itself.
+    """
+
+    def __init__(self, batch_size: int = RESULT_BATCH_SIZE, flush_interval: float = RESULT_FLUSH_INTERVAL):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[CheckResult] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._batch: list[CheckResult] = []  # taken off the queue but not yet flushed
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the writer and flushes whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await self._flush(pending)
+
+    def submit(self, result: CheckResult):
+        self._queue.put_nowait(result)
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    async def _collect(self) -> list[CheckResult]:
+        loop = asyncio.get_running_loop()
+        # Kept on the instance so stop() can still persist it if we are cancelled mid-way
+        batch = self._batch
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            await self._flush(batch)
+            self._batch = []
+
+    async def _flush(self, batch: list[CheckResult], attempts: int = 3):
+        # Only the newest result per monitor needs to reach the monitors table
+        latest: dict[uuid.UUID, CheckResult] = {}
+        for result in batch:
+            current = latest.get(result.monitor_id)
+            if current is None or result.checked_at >= current.checked_at:
+                latest[result.monitor_id] = result
+
+        for attempt in range(1, attempts + 1):
+            started = time.perf_counter()
+            try:
+                async with async_session() as session:
+                    await self._write(session, batch, latest)
+                    await session.commit()
+                metrics.flush_duration.observe(time.perf_counter() - started, outcome="ok")
+                metrics.flush_size.observe(len(batch))
+                logger.debug(f"Flushed {len(batch)} check results.")
+                return
+            except IntegrityError:
+                metrics.flush_duration.observe(time.perf_counter() - started, outcome="error")
+                # A monitor was deleted after it was checked; drop its results and retry
+                async with async_session() as session:
+                    existing = set((await session.execute(
+                        select(Monitor.id).where(Monitor.id.in_(list(latest)))
+                    )).scalars().all())
+                batch = [result for result in batch if result.monitor_id in existing]
+                latest = {monitor_id: result for monitor_id, result in latest.items() if monitor_id in existing}
+                if not batch:
+                    return
+            except Exception as e:
+                metrics.flush_duration.observe(time.perf_counter() - started, outcome="error")
+                logger.error(f"Failed to flush {len(batch)} check results (attempt {attempt}/{attempts}): {e}")
+                if attempt < attempts:
+                    await asyncio.sleep(attempt)
+
+    @staticmethod
+    async def _write(session, batch: list[CheckResult], latest: dict[uuid.UUID, CheckResult]):
+        # Multi-row INSERT of the check logs
+        await session.execute(insert(CheckLog), [asdict(result) for result in batch])
+
+        # executemany UPDATE of the monitors' last result (Core statement, so no per-row ORM bookkeeping)
+        monitors = Monitor.__table__
+        stmt = (
+            update(monitors)
+            .where(monitors.c.id == bindparam("b_id"))
+            .values(
+                last_checked=bindparam("b_last_checked", type_=DateTime(timezone=True)),
+                last_status=bindparam("b_last_status"),
+            )
+        )
+        await session.execute(stmt, [
+            {"b_id": result.monitor_id, "b_last_checked": result.checked_at, "b_last_status": result.is_up}
+            for result in latest.values()
+        ])
+
+
+result_writer = CheckResultWriter()
+metrics.result_backlog.set_function(lambda: result_writer.backlog)
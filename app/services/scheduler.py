@@ -1,17 +1,627 @@
 import asyncio
-from app.services.monitor_service import check_all_monitors
+import functools
+import heapq
+import itertools
+import math
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, bindparam, update
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+from app.config import (
+    SCHEDULER_RECONCILE_SECONDS, SCHEDULER_DUE_SWEEP_SECONDS, SCHEDULER_DUE_SWEEP_LIMIT,
+    CHECK_COALESCE_WINDOW, CHECK_MAX_START_RATE,
+    CHECK_OVERLOAD_POLICY, CHECK_OVERLOAD_HEADROOM, CHECK_MAX_STRETCH,
+)
+from app.database.connection import async_session
+from app.models import Monitor
+from app.services.monitor_service import check_monitor_group, probe_key, retry_delay
+from app.services.monitor_cache import monitor_cache, MonitorConfig
+from app.services.probe_pipeline import ProbePipeline
+from app.services.sharding import ShardCoordinator
+from app.services.change_feed import change_feed
+from app.services import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How often demand vs capacity is re-evaluated
+OVERLOAD_CHECK_SECONDS = 10
+# How often planned due times are written back to monitors.next_check_at
+PERSIST_PLAN_SECONDS = 5
+
+
+class MonitorScheduler:
+    """
+    In-process scheduler that keeps a min-heap of next-due times.
+
+    The loop sleeps until the earliest monitor is due instead of polling on a
+    fixed tick. The database is only read at startup, for monitors that were
+    explicitly invalidated (created, edited, paused, deleted), by a cheap
+    indexed sweep of due rows (next_check_at <= now) that picks up monitors this
+    process isn't tracking yet, and by a slow full reconciliation. Every planned
+    due time (including maintenance deferrals, shed checks and stretched
+    intervals) is written back to next_check_at in batches, so the column
+    mirrors the real schedule and the sweep only finds genuinely due rows.
+    Due monitors are handed to a bounded ProbePipeline rather than gathered all at once,
+    and monitors due within `coalesce_window` of each other that send the same
+    request are grouped into a single probe.
+
+    Each monitor runs at a stable phase within its interval (derived from its
+    URL, so identical targets stay aligned and keep coalescing), and no more than
+    `max_start_rate` checks start per second. New and overdue monitors are
+    therefore spread over their interval instead of firing in one burst.
+
+    A failed check that still needs confirmation (consecutive_checks) is not
+    retried inside its worker: it is put back on the heap with a backoff delay
+    and keeps its place in the regular cycle, so a slow outage never pins a
+    worker while it sleeps.
+
+    When several schedulers run (uvicorn workers, replicas), each only keeps
+    the monitors its ShardCoordinator says it owns, and does a full
+    reconciliation whenever the set of live schedulers changes. Edits made in
+    other processes arrive through the LISTEN/NOTIFY change feed.
+
+    The scheduler also compares demand (sum of 1/interval over its monitors)
+    with its measured capacity (workers / recent job duration, capped by the
+    start rate). When demand exceeds capacity, `overload_policy` decides how to
+    degrade: "stretch" lengthens intervals just enough to fit, stretching
+    monitors with notifications off before the others; "shed" skips checks
+    that are already a whole interval late; "off" keeps the old behaviour of
+    simply running late.
+    """
+
+    def __init__(
+        self,
+        reconcile_seconds: int = SCHEDULER_RECONCILE_SECONDS,
+        due_sweep_seconds: int = SCHEDULER_DUE_SWEEP_SECONDS,
+        due_sweep_limit: int = SCHEDULER_DUE_SWEEP_LIMIT,
+        coalesce_window: float = CHECK_COALESCE_WINDOW,
+        max_start_rate: float = CHECK_MAX_START_RATE,
+        overload_policy: str = CHECK_OVERLOAD_POLICY,
+        overload_headroom: float = CHECK_OVERLOAD_HEADROOM,
+        max_stretch: float = CHECK_MAX_STRETCH,
+    ):
+        self.reconcile_seconds = reconcile_seconds
+        self.due_sweep_seconds = due_sweep_seconds
+        self.due_sweep_limit = due_sweep_limit
+        self.coalesce_window = coalesce_window
+        self.max_start_rate = max_start_rate
+        self.overload_policy = overload_policy
+        self.overload_headroom = overload_headroom
+        self.max_stretch = max(1.0, max_stretch)
+
+        # Heap entries are (due_at, tie_breaker, monitor_id). Entries whose
+        # due_at no longer matches self._due are stale and skipped lazily.
+        self._heap: list[tuple[float, int, uuid.UUID]] = []
+        self._due: dict[uuid.UUID, float] = {}
+        self._intervals: dict[uuid.UUID, int] = {}
+        self._phases: dict[uuid.UUID, int] = {}
+        self._low_priority: set[uuid.UUID] = set()  # notifications off: stretched first when overloaded
+        self._in_flight: set[uuid.UUID] = set()
+        # Pending confirmation retries: monitor_id -> (attempt, original due_at, monitor)
+        self._retries: dict[uuid.UUID, tuple[int, float, MonitorConfig]] = {}
+        self._counter = itertools.count()
+
+        # Overload state, recomputed by _update_load()
+        self.overloaded = False
+        self._stretch = {"high": 1.0, "low": 1.0}
+
+        # Start-rate token bucket (one second of burst, but always room for one start)
+        self._tokens = max(1.0, max_start_rate)
+        self._tokens_at: float | None = None
+
+        self._dirty: set[uuid.UUID] = set()
+        self._planned: dict[uuid.UUID, float] = {}  # due times not yet written to next_check_at
+        self._reconcile_requested = False
+        self.last_loop_at: float | None = None  # loop clock; read by the watchdog and /health
+        self._wakeup = asyncio.Event()
+        self._batches: set[asyncio.Task] = set()
+        self.pipeline = ProbePipeline(handler=check_monitor_group)
+        self.shards = ShardCoordinator()
+
+    # --- Heap maintenance ---
+
+    def _schedule(self, monitor_id: uuid.UUID, due_at: float, persist: bool = True):
+        self._due[monitor_id] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._counter), monitor_id))
+        if persist:
+            self._planned[monitor_id] = due_at
+
+    def _forget(self, monitor_id: uuid.UUID):
+        self._due.pop(monitor_id, None)
+        self._intervals.pop(monitor_id, None)
+        self._phases.pop(monitor_id, None)
+        self._low_priority.discard(monitor_id)
+        self._planned.pop(monitor_id, None)
+        if self._retries.pop(monitor_id, None) is not None:
+            self._in_flight.discard(monitor_id)
+
+    def _pop_due(self, now: float, limit: int | None = None) -> dict[uuid.UUID, float]:
+        due = {}
+        while self._heap and self._heap[0][0] <= now and (limit is None or len(due) < limit):
+            due_at, _, monitor_id = heapq.heappop(self._heap)
+            if self._due.get(monitor_id) != due_at:
+                continue  # stale entry
+            del self._due[monitor_id]
+            due[monitor_id] = due_at
+        return due
+
+    def _next_due(self) -> float | None:
+        while self._heap:
+            due_at, _, monitor_id = self._heap[0]
+            if self._due.get(monitor_id) == due_at:
+                return due_at
+            heapq.heappop(self._heap)
+        return None
+
+    # --- Phase placement ---
+
+    @staticmethod
+    def _phase_for(url: str, interval_seconds: int) -> int:
+        """Stable offset within the interval; crc32 because hash() is randomized per process."""
+        return zlib.crc32(url.encode()) % max(1, interval_seconds)
+
+    def _next_slot(self, monitor_id: uuid.UUID, not_before: float) -> float:
+        """
+        First time >= not_before (loop clock) that falls on the monitor's phase.
+        Phases are anchored to wall-clock time so they survive restarts.
+        """
+        interval = max(1, self._intervals[monitor_id])
+        phase = self._phases.get(monitor_id, 0)
+        offset = time.time() - asyncio.get_running_loop().time()
+        wall = not_before + offset
+        # Half a second of tolerance so float noise never pushes a slot a whole interval out
+        slot = phase + math.ceil((wall - phase - 0.5) / interval) * interval
+        return slot - offset
+
+    def _initial_due(self, monitor_id: uuid.UUID, next_check_at: datetime | None, now: float) -> float:
+        """Places a newly loaded monitor on its phase, no earlier than its stored next_check_at."""
+        if not next_check_at:
+            return self._next_slot(monitor_id, now)
+        if next_check_at.tzinfo is None:
+            next_check_at = next_check_at.replace(tzinfo=timezone.utc)
+        wait = (next_check_at - datetime.now(timezone.utc)).total_seconds()
+        # Overdue monitors also wait for their slot, which spreads them over the next interval;
+        # a shortened interval never leaves a monitor waiting longer than the new one
+        return self._next_slot(monitor_id, now + min(max(0.0, wait), self._intervals[monitor_id]))
+
+    def _take_start_tokens(self, now: float) -> int | None:
+        """How many checks may start right now (None = unlimited)."""
+        if self.max_start_rate <= 0:
+            return None
+        if self._tokens_at is not None:
+            self._tokens = min(max(1.0, self.max_start_rate), self._tokens + (now - self._tokens_at) * self.max_start_rate)
+        self._tokens_at = now
+        return int(self._tokens)
+
+    def _spend_start_tokens(self, count: int):
+        if self.max_start_rate > 0:
+            self._tokens -= count
+
+    # --- Overload handling ---
+
+    def _update_load(self):
+        """Recomputes demand vs capacity and the resulting interval stretch factors."""
+        capacity = self.pipeline.capacity()
+        if self.max_start_rate > 0:
+            capacity = self.max_start_rate if capacity is None else min(capacity, self.max_start_rate)
+        high = sum(1 / max(1, interval) for monitor_id, interval in self._intervals.items() if monitor_id not in self._low_priority)
+        low = sum(1 / max(1, self._intervals[monitor_id]) for monitor_id in self._low_priority if monitor_id in self._intervals)
+
+        stretch = {"high": 1.0, "low": 1.0}
+        overloaded = False
+        if capacity is not None:
+            capacity *= self.overload_headroom
+            overloaded = high + low > capacity
+            if overloaded and self.overload_policy == "stretch":
+                if high < capacity:
+                    stretch["low"] = min(self.max_stretch, low / (capacity - high))
+                else:
+                    stretch["high"] = min(self.max_stretch, high / capacity)
+                    stretch["low"] = self.max_stretch
+            metrics.scheduler_capacity.set(capacity)
+
+        if overloaded != self.overloaded:
+            if overloaded:
+                logger.warning(
+                    f"Scheduler overloaded: {high + low:.1f} checks/s wanted, ~{capacity:.1f} checks/s possible "
+                    f"(policy {self.overload_policy}, stretch {stretch['high']:.2f}/{stretch['low']:.2f})."
+                )
+            else:
+                logger.info("Scheduler no longer overloaded.")
+        self.overloaded = overloaded
+        self._stretch = stretch
+
+        metrics.scheduler_demand.set(high + low)
+        metrics.scheduler_overloaded.set(1 if overloaded else 0)
+        for priority, factor in stretch.items():
+            metrics.scheduler_stretch.set(factor, priority=priority)
+
+    def _shed(self, due: dict[uuid.UUID, float], now: float) -> dict[uuid.UUID, float]:
+        """Under the "shed" policy, drops checks that already missed a whole interval and reschedules them."""
+        if not self.overloaded or self.overload_policy != "shed":
+            return due
+        kept = {}
+        for monitor_id, due_at in due.items():
+            interval = self._intervals.get(monitor_id)
+            if interval is not None and monitor_id not in self._retries and now - due_at > interval:
+                metrics.checks_shed_total.inc()
+                self._complete(monitor_id, due_at)
+            else:
+                kept[monitor_id] = due_at
+        return kept
+
+    # --- Database sync ---
+
+    def invalidate(self, monitor_id: uuid.UUID):
+        """
+        Marks a monitor as changed so its schedule and cached config are re-read,
+        here and (through the change feed) in every other scheduler process.
+        """
+        self._apply_change(monitor_id)
+        change_feed.publish(monitor_id)
+
+    def _apply_change(self, monitor_id: uuid.UUID):
+        monitor_cache.invalidate(monitor_id)
+        self._dirty.add(monitor_id)
+        self._wakeup.set()
+
+    def _request_reconcile(self):
+        # Called when the change feed reconnects: anything published meanwhile was missed
+        self._reconcile_requested = True
+        self._wakeup.set()
+
+    def _track(self, monitor_id: uuid.UUID, url: str, interval_seconds: int, notifications: bool):
+        self._intervals[monitor_id] = interval_seconds
+        self._phases[monitor_id] = self._phase_for(url, interval_seconds)
+        if notifications:
+            self._low_priority.discard(monitor_id)
+        else:
+            self._low_priority.add(monitor_id)
+
+    async def _load(self, monitor_ids: set[uuid.UUID] | None = None):
+        """
+        Reads schedule-relevant columns only (no relationships).
+        With monitor_ids=None this is a full reconciliation sweep.
+        Monitors owned by another scheduler node are treated as inactive here.
+        """
+        stmt = select(
+            Monitor.id, Monitor.url, Monitor.interval_seconds, Monitor.next_check_at, Monitor.is_notification_enabled
+        ).where(Monitor.is_active == True)
+        if monitor_ids is not None:
+            stmt = stmt.where(Monitor.id.in_(monitor_ids))
+
+        async with async_session() as session:
+            result = await session.execute(stmt)
+            rows = result.all()
+
+        now = asyncio.get_running_loop().time()
+        seen = set()
+        for monitor_id, url, interval_seconds, next_check_at, notifications in rows:
+            if not self.shards.owns(monitor_id):
+                continue
+            seen.add(monitor_id)
+            previous = (self._intervals.get(monitor_id), self._phases.get(monitor_id))
+            self._track(monitor_id, url, interval_seconds, notifications)
+
+            # In-flight monitors are rescheduled by their batch when it finishes
+            if monitor_id in self._in_flight:
+                continue
+            if monitor_id in self._due and previous == (interval_seconds, self._phases[monitor_id]):
+                continue
+            self._place(monitor_id, next_check_at, now)
+
+        # Anything we asked for (or knew about) that is no longer active is dropped
+        candidates = monitor_ids if monitor_ids is not None else set(self._intervals)
+        for monitor_id in candidates - seen:
+            self._forget(monitor_id)
+
+    def _place(self, monitor_id: uuid.UUID, next_check_at: datetime | None, now: float):
+        """Schedules a loaded monitor; the row is only rewritten if its slot differs from what is stored."""
+        due_at = self._initial_due(monitor_id, next_check_at, now)
+        persist = True
+        if next_check_at is not None:
+            if next_check_at.tzinfo is None:
+                next_check_at = next_check_at.replace(tzinfo=timezone.utc)
+            persist = abs((self._to_wall(due_at) - next_check_at).total_seconds()) >= 1
+        self._schedule(monitor_id, due_at, persist=persist)
+
+    @staticmethod
+    def _to_wall(due_at: float) -> datetime:
+        offset = time.time() - asyncio.get_running_loop().time()
+        return datetime.fromtimestamp(due_at + offset, tz=timezone.utc)
+
+    async def _persist_planned(self):
+        """Writes pending planned due times to next_check_at with one executemany UPDATE."""
+        if not self._planned:
+            return
+        planned, self._planned = self._planned, {}
+        monitors = Monitor.__table__
+        stmt = (
+            update(monitors)
+            .where(monitors.c.id == bindparam("b_id"))
+            .values(next_check_at=bindparam("b_next_check_at", type_=DateTime(timezone=True)))
+        )
+        try:
+            async with async_session() as session:
+                await session.execute(stmt, [
+                    {"b_id": monitor_id, "b_next_check_at": self._to_wall(due_at)}
+                    for monitor_id, due_at in planned.items()
+                ])
+                await session.commit()
+        except Exception:
+            # Keep anything planned since for the next attempt
+            self._planned = {**planned, **self._planned}
+            raise
+
+    async def _sweep_due(self):
+        """
+        Range read on the partial next_check_at index for due monitors that this
+        node owns but isn't tracking (created or resumed by another process, or
+        handed over by a dead node). Monitors already on the heap are left alone.
+        """
+        stmt = (
+            select(Monitor.id, Monitor.url, Monitor.interval_seconds, Monitor.next_check_at, Monitor.is_notification_enabled)
+            .where(Monitor.is_active == True, Monitor.next_check_at <= func.now())
+            .order_by(Monitor.next_check_at)
+            .limit(self.due_sweep_limit)
+        )
+        async with async_session() as session:
+            result = await session.execute(stmt)
+            rows = result.all()
+
+        now = asyncio.get_running_loop().time()
+        picked = 0
+        for monitor_id, url, interval_seconds, next_check_at, notifications in rows:
+            if monitor_id in self._due or monitor_id in self._in_flight or not self.shards.owns(monitor_id):
+                continue
+            self._track(monitor_id, url, interval_seconds, notifications)
+            self._place(monitor_id, next_check_at, now)
+            picked += 1
+        if picked:
+            logger.info(f"Due sweep picked up {picked} untracked monitors.")
+
+    # --- Execution ---
+
+    def _dispatch(self, due: dict[uuid.UUID, float]):
+        now = asyncio.get_running_loop().time()
+        for due_at in due.values():
+            # Coalescing may dispatch slightly early; that isn't lag
+            metrics.scheduler_lag.observe(max(0.0, now - due_at))
+        self._in_flight.update(due)
+        task = asyncio.create_task(self._enqueue(due))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _enqueue(self, due: dict[uuid.UUID, float]):
+        """Resolves the due monitors' configs (cached; misses in one query) and hands them to the probe pipeline."""
+        # Retries reuse the monitor loaded for their first attempt
+        retries = {monitor_id: self._retries[monitor_id] for monitor_id in due if monitor_id in self._retries}
+        fresh = [monitor_id for monitor_id in due if monitor_id not in retries]
+
+        monitors = []
+        if fresh:
+            try:
+                monitors = await monitor_cache.get_many(fresh)
+            except Exception as e:
+                logger.error(f"Error loading due monitors: {e}")
+                for monitor_id in fresh:
+                    self._complete(monitor_id, due[monitor_id])
+                fresh = []
+
+        anchors = {monitor.id: due[monitor.id] for monitor in monitors}
+        attempts = {}
+        for monitor_id, (attempt, anchor, monitor) in retries.items():
+            monitors.append(monitor)
+            anchors[monitor_id] = anchor
+            attempts[monitor_id] = attempt
+
+        # Monitors inside a maintenance window aren't probed at all; they come back when it ends
+        wall_now = datetime.now(timezone.utc)
+        probing = []
+        for monitor in monitors:
+            window_end = monitor.maintenance.window_end(wall_now)
+            if window_end is None:
+                probing.append(monitor)
+            else:
+                metrics.checks_skipped_maintenance_total.inc()
+                self._retries.pop(monitor.id, None)
+                self._defer(monitor.id, anchors[monitor.id], (window_end - wall_now).total_seconds())
+        monitors = probing
+
+        # Identical requests share one probe whose result is fanned out to each monitor
+        groups = {}
+        for monitor in monitors:
+            groups.setdefault(probe_key(monitor), []).append(monitor)
+
+        for group in groups.values():
+            self.pipeline.submit(
+                group,
+                functools.partial(self._complete_group, group, {m.id: anchors[m.id] for m in group}),
+                attempts={m.id: attempts[m.id] for m in group if m.id in attempts},
+            )
+
+        # Deleted or paused since they were scheduled
+        for monitor_id in set(fresh) - set(anchors):
+            self._in_flight.discard(monitor_id)
+            self._forget(monitor_id)
+
+        if self.pipeline.queue_depth > self.pipeline.concurrency:
+            logger.info(f"Probe queue depth is {self.pipeline.queue_depth} ({self.pipeline.in_flight} in flight).")
+
+    def _complete_group(self, monitors: list[MonitorConfig], due: dict[uuid.UUID, float], results: dict | None):
+        for monitor in monitors:
+            # None means the check failed but has confirmation attempts left
+            if results and monitor.id in results and results[monitor.id] is None:
+                self._retry(monitor, due[monitor.id])
+            else:
+                self._retries.pop(monitor.id, None)
+                self._complete(monitor.id, due[monitor.id])
+
+    def _retry(self, monitor: MonitorConfig, due_at: float):
+        if monitor.id not in self._intervals:
+            self._retries.pop(monitor.id, None)
+            self._in_flight.discard(monitor.id)
+            return  # deleted or paused while running
+        attempt = self._retries.get(monitor.id, (1,))[0]
+        self._retries[monitor.id] = (attempt + 1, due_at, monitor)
+        # Stays in _in_flight so reconciliation doesn't reschedule it underneath the retry;
+        # next_check_at keeps the regular slot, which the retry still counts against
+        self._schedule(monitor.id, asyncio.get_running_loop().time() + retry_delay(attempt), persist=False)
+        self._wakeup.set()
+
+    def _defer(self, monitor_id: uuid.UUID, due_at: float, seconds: float):
+        """Reschedules a monitor onto its first phase slot after `seconds` from now (e.g. a maintenance window's end)."""
+        self._in_flight.discard(monitor_id)
+        interval = self._intervals.get(monitor_id)
+        if interval is None:
+            return
+        now = asyncio.get_running_loop().time()
+        self._schedule(monitor_id, self._next_slot(monitor_id, max(due_at + interval, now + seconds)))
+        self._wakeup.set()
+
+    def _complete(self, monitor_id: uuid.UUID, due_at: float):
+        self._in_flight.discard(monitor_id)
+        interval = self._intervals.get(monitor_id)
+        if interval is None:
+            return  # deleted or paused while running
+        now = asyncio.get_running_loop().time()
+        stretch = self._stretch["low" if monitor_id in self._low_priority else "high"]
+        if stretch > 1:
+            # Overloaded: off the phase grid until load drops (identical monitors still stretch alike)
+            self._schedule(monitor_id, max(due_at + interval * stretch, now))
+        else:
+            # Anchor on the planned due time so intervals don't drift; after an overrun, wait for the next phase slot
+            self._schedule(monitor_id, self._next_slot(monitor_id, max(due_at + interval, now)))
+        self._wakeup.set()
+
+    def _reset(self):
+        """Drops all schedule state; the next iteration rebuilds it with a full reconcile."""
+        self._heap.clear()
+        self._due.clear()
+        self._intervals.clear()
+        self._phases.clear()
+        self._in_flight.clear()
+        self._retries.clear()
+        self._dirty.clear()
+        self._low_priority.clear()
+        self._planned.clear()
+
+    def heartbeat_age(self) -> float | None:
+        """Seconds since the loop last completed an iteration (None before the first one)."""
+        if self.last_loop_at is None:
+            return None
+        return asyncio.get_running_loop().time() - self.last_loop_at
+
+    def overdue_seconds(self) -> float:
+        """How late the earliest monitor still waiting for dispatch is."""
+        next_due = self._next_due()
+        if next_due is None:
+            return 0.0
+        return max(0.0, asyncio.get_running_loop().time() - next_due)
+
+    async def _sleep(self, until: float):
+        timeout = max(0.0, until - asyncio.get_running_loop().time())
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_reconcile = loop.time()  # full load on the first iteration
+        next_heartbeat = loop.time()
+        next_sweep = loop.time() + self.due_sweep_seconds
+        next_load_update = loop.time()
+        next_persist = loop.time() + PERSIST_PLAN_SECONDS
+        # A restart (see watchdog) must not inherit in-flight markers whose jobs were dropped
+        self._reset()
+        self.last_loop_at = loop.time()
+        self.pipeline.start()
+        listener = asyncio.create_task(change_feed.listen(self._apply_change, self._request_reconcile))
+
+        try:
+            while True:
+                try:
+                    if self._reconcile_requested:
+                        self._reconcile_requested = False
+                        next_reconcile = loop.time()
+
+                    if loop.time() >= next_heartbeat:
+                        next_heartbeat = loop.time() + self.shards.heartbeat_seconds
+                        try:
+                            if await self.shards.heartbeat():
+                                next_reconcile = loop.time()  # rebalance now
+                        except Exception as e:
+                            # Keep the last known membership; peers expire us if this persists
+                            logger.warning(f"Scheduler heartbeat failed: {e}")
+
+                    if loop.time() >= next_reconcile:
+                        self._dirty.clear()
+                        await self._load()
+                        next_reconcile = loop.time() + self.reconcile_seconds
+                        next_sweep = loop.time() + self.due_sweep_seconds
+                        logger.debug(f"Scheduler reconciled {len(self._intervals)} active monitors.")
+                    elif loop.time() >= next_sweep:
+                        next_sweep = loop.time() + self.due_sweep_seconds
+                        await self._sweep_due()
+
+                    if self._dirty:
+                        dirty, self._dirty = self._dirty, set()
+                        try:
+                            await self._load(dirty)
+                        except Exception:
+                            self._dirty |= dirty
+                            raise
+
+                    if loop.time() >= next_load_update:
+                        next_load_update = loop.time() + OVERLOAD_CHECK_SECONDS
+                        self._update_load()
+
+                    if loop.time() >= next_persist:
+                        next_persist = loop.time() + PERSIST_PLAN_SECONDS
+                        await self._persist_planned()
+
+                    # Slightly early is fine if it lets identical probes share a request
+                    now = loop.time()
+                    due = self._shed(self._pop_due(now + self.coalesce_window, limit=self._take_start_tokens(now)), now)
+                    if due:
+                        self._spend_start_tokens(len(due))
+                        self._dispatch(due)
+                except Exception as e:
+                    logger.error(f"Error in scheduler loop: {e}")
+                    await asyncio.sleep(10)
+                    continue
+                finally:
+                    self.last_loop_at = loop.time()
+
+                next_due = self._next_due()
+                if next_due is not None and self.max_start_rate > 0:
+                    # Still due but throttled: come back when the next token is available
+                    next_due = max(next_due, loop.time() + 1 / self.max_start_rate)
+                wake = min(next_reconcile, next_heartbeat, next_sweep, next_persist)
+                await self._sleep(wake if next_due is None else min(next_due, wake))
+        finally:
+            listener.cancel()
+            for task in self._batches:
+                task.cancel()
+            await self.pipeline.stop()
+            try:
+                await self._persist_planned()
+            except Exception as e:
+                logger.warning(f"Could not persist planned check times on shutdown: {e}")
+            await self.shards.leave()
+
+
+scheduler = MonitorScheduler()
+metrics.probe_queue_depth.set_function(lambda: scheduler.pipeline.queue_depth)
+metrics.probes_in_flight.set_function(lambda: scheduler.pipeline.in_flight)
+
+
 async def start_scheduler():
     logger.info("Starting monitoring scheduler...")
-    while True:
-        try:
-            await check_all_monitors()
-        except Exception as e:
-            logger.error(f"Error in scheduler loop: {e}")
-        
-        # Determine wait time. For checking intervals of 60s, wait 10s or 5s?
-        # If we check every 10 seconds, we pick up monitors that are due.
-        await asyncio.sleep(10) 
+    await scheduler.run()
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import socket
+import uuid
+from datetime import timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+from app.config import SCHEDULER_HEARTBEAT_SECONDS, SCHEDULER_NODE_TTL_SECONDS
+from app.database.connection import async_session
+from app.models import SchedulerNode
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ShardCoordinator:
+    """
+    Splits monitors between every running scheduler (uvicorn worker or replica).
+
+    Each scheduler registers a row in scheduler_nodes and refreshes it every
+    `heartbeat_seconds`. Nodes whose heartbeat is older than `node_ttl_seconds`
+    are considered dead and removed. A monitor belongs to the live node with the
+    highest rendezvous hash for (node, monitor), so when a node joins or dies
+    only the monitors it owned (or now owns) move; everyone else keeps theirs.
+    """
+
+    def __init__(self, heartbeat_seconds: int = SCHEDULER_HEARTBEAT_SECONDS, node_ttl_seconds: int = SCHEDULER_NODE_TTL_SECONDS):
+        self.heartbeat_seconds = heartbeat_seconds
+        self.node_ttl_seconds = node_ttl_seconds
+        self.hostname = socket.gethostname()
+        self.node_id = f"{self.hostname}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.nodes: tuple[str, ...] = (self.node_id,)
+
+    @staticmethod
+    def _score(node_id: str, monitor_id: uuid.UUID) -> int:
+        digest = hashlib.blake2b(f"{node_id}/{monitor_id}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def owner(self, monitor_id: uuid.UUID) -> str:
+        return max(self.nodes, key=lambda node_id: self._score(node_id, monitor_id))
+
+    def owns(self, monitor_id: uuid.UUID) -> bool:
+        if len(self.nodes) == 1:
+            return True
+        return self.owner(monitor_id) == self.node_id
+
+    async def heartbeat(self) -> bool:
+        """
+        Refreshes this node's row, expires dead nodes and reads the live set.
+        Returns True when membership changed (monitors need rebalancing).
+        Timestamps come from the database so clock skew between hosts doesn't matter.
+        """
+        cutoff = func.now() - timedelta(seconds=self.node_ttl_seconds)
+        async with async_session() as session:
+            await session.execute(
+                insert(SchedulerNode)
+                .values(node_id=self.node_id, hostname=self.hostname)
+                .on_conflict_do_update(index_elements=[SchedulerNode.node_id], set_={"heartbeat_at": func.now()})
+            )
+            await session.execute(delete(SchedulerNode).where(SchedulerNode.heartbeat_at < cutoff))
+            result = await session.execute(select(SchedulerNode.node_id).order_by(SchedulerNode.node_id))
+            live = result.scalars().all()
+            await session.commit()
+
+        # Our own row was just written, but keep ourselves in the set regardless
+        nodes = tuple(sorted(set(live) | {self.node_id}))
+        changed = nodes != self.nodes
+        if changed:
+            logger.info(f"Scheduler membership changed: {len(nodes)} node(s) live, this node is {self.node_id}.")
+        self.nodes = nodes
+        return changed
+
+    async def leave(self):
+        """Deregisters this node so the others pick up its monitors on their next heartbeat."""
+        try:
+            async with async_session() as session:
+                await session.execute(delete(SchedulerNode).where(SchedulerNode.node_id == self.node_id))
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not deregister scheduler node {self.node_id}: {e}")
@@ -0,0 +1,122 @@
+import asyncio
+import ssl
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from app.config import SSL_CACHE_TTL_SECONDS
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CertificateExpiryCache:
+    """
+    Certificate expiry dates keyed by (host, port).
+
+    Expiry only changes when a certificate is renewed, so entries are kept for
+    hours. Most entries are filled from the TLS connection the probe already
+    made; only cache misses open a dedicated connection.
+    """
+
+    def __init__(self, ttl_seconds: int = SSL_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[tuple[str, int], tuple[float, datetime]] = {}
+
+    def get(self, host: str, port: int) -> datetime | None:
+        entry = self._entries.get((host, port))
+        if entry is None:
+            return None
+        stored_at, not_after = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[(host, port)]
+            return None
+        return not_after
+
+    def put(self, host: str, port: int, not_after: datetime):
+        self._entries[(host, port)] = (time.monotonic(), not_after)
+
+
+cert_cache = CertificateExpiryCache()
+
+
+def _parse_not_after(cert: dict) -> datetime | None:
+    not_after_str = cert.get('notAfter') if cert else None
+    if not not_after_str:
+        return None
+    # Format: 'May 26 23:59:59 2025 GMT'
+    return datetime.fromtimestamp(ssl.cert_time_to_seconds(not_after_str), tz=timezone.utc)
+
+
+def remember_peer_certificate(response, url: str | None = None) -> None:
+    """
+    Caches the expiry of the certificate presented on the probe's own connection.
+    Besides the final (post-redirect) host, the entry is stored under the host
+    of `url`, the monitor's own URL that get_ssl_expiry_days() looks up, so
+    redirecting monitors (http -> https, apex -> www) still hit the cache.
+    Best effort: silently does nothing for plain HTTP or when the transport
+    does not expose the TLS object.
+    """
+    try:
+        if response.url.scheme != 'https':
+            return
+        network_stream = response.extensions.get("network_stream")
+        if network_stream is None:
+            return
+        ssl_object = network_stream.get_extra_info("ssl_object")
+        if ssl_object is None:
+            return
+        not_after = _parse_not_after(ssl_object.getpeercert())
+        if not_after is None:
+            return
+        cert_cache.put(response.url.host, response.url.port or 443, not_after)
+        if url:
+            parsed = urlparse(url)
+            # get_ssl_expiry_days() only looks up https URLs
+            if parsed.scheme == 'https' and parsed.hostname:
+                cert_cache.put(parsed.hostname, parsed.port or 443, not_after)
+    except Exception as e:
+        logger.debug(f"Could not read peer certificate for {response.url}: {e}")
+
+
+async def _fetch_not_after(hostname: str, port: int, timeout: float) -> datetime | None:
+    """Opens a native asyncio TLS connection just long enough to read the certificate."""
+    context = ssl.create_default_context()
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(hostname, port, ssl=context, server_hostname=hostname),
+        timeout=timeout
+    )
+    try:
+        return _parse_not_after(writer.get_extra_info("peercert"))
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+
+async def get_ssl_expiry_days(url: str, timeout: float = 5):
+    """
+    Checks the SSL certificate expiry for the given URL.
+    Returns the number of days until expiry, or None if error/check inapplicable.
+    """
+    try:
+        parsed = urlparse(url)
+        if parsed.scheme != 'https':
+            return None
+
+        hostname = parsed.hostname
+        port = parsed.port or 443
+
+        expiry_date = cert_cache.get(hostname, port)
+        if expiry_date is None:
+            expiry_date = await _fetch_not_after(hostname, port, timeout)
+            if expiry_date is None:
+                return None
+            cert_cache.put(hostname, port, expiry_date)
+
+        delta = expiry_date - datetime.now(timezone.utc)
+        return delta.days
+    except Exception as e:
+        logger.warning(f"SSL Check failed for {url}: {e}")
+        return None
@@ -51,6 +51,20 @@ async def get_monitor_stats(monitor_id):
         res_avg_lat = await session.execute(q_avg_lat)
         avg_lat = res_avg_lat.scalar() or 0.0
 
+        # Average per-phase breakdown (24h); avg() ignores checks that skipped a phase
+        phase_columns = {
+            "dns": CheckLog.dns_time,
+            "connect": CheckLog.connect_time,
+            "tls": CheckLog.tls_time,
+            "ttfb": CheckLog.ttfb,
+            "transfer": CheckLog.transfer_time,
+        }
+        q_phases = select(*(func.avg(column) for column in phase_columns.values())).where(
+            CheckLog.monitor_id == monitor_id,
+            CheckLog.checked_at >= one_day_ago
+        )
+        res_phases = await session.execute(q_phases)
+        avg_phases = dict(zip(phase_columns, res_phases.one()))
 
 
         # Get last incident
@@ -75,5 +89,6 @@ async def get_monitor_stats(monitor_id):
             "uptime_7d": uptime_7d,
             "uptime_30d": uptime_30d,
             "avg_latency_24h": avg_lat,
+            "avg_phases_24h": avg_phases,
             "last_incident": last_down_time
         }
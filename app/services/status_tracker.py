@@ -0,0 +1,129 @@
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from app.config import (
+    FLAP_WINDOW, FLAP_HIGH_THRESHOLD, FLAP_LOW_THRESHOLD, FLAP_MIN_SAMPLES, FLAP_MIN_CHANGES,
+    STATUS_RECOVERY_CHECKS,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+UP = "UP"
+DEGRADED = "DEGRADED"  # up, but with warnings (latency, SSL expiry)
+DOWN = "DOWN"
+FLAPPING = "FLAPPING"
+
+
+@dataclass
+class StatusNotice:
+    """A change users should be told about."""
+    previous_status: bool | None
+    current_status: bool
+    summary: str | None = None
+
+
+@dataclass
+class _Track:
+    state: str | None
+    notified: bool | None  # last status users were told about
+    history: deque = field(default_factory=deque)
+    streak: int = 0  # consecutive results equal to the latest one
+    flap_changes: int = 0
+
+
+class StatusTracker:
+    """
+    Per-monitor status state machine (UP / DEGRADED / DOWN / FLAPPING).
+
+    Every check verdict goes into a sliding window of the last `window` results
+    kept in memory, so state carries over from one scheduled check to the next.
+    A monitor is FLAPPING when at least `min_samples` results are known, at
+    least `min_changes` of them differ from the one before, and that is at
+    least `high_threshold` of the window; the minimums keep a single outage
+    right after a restart (empty history) from looking like flapping. It only
+    leaves that state once the share drops to `low_threshold` or the last
+    `min_samples` results agree. Notifications are suppressed while flapping and
+    replaced by one summary when the monitor settles. Recovering from DOWN
+    needs `recovery_checks` UP results in a row, so one lucky check does not
+    announce a recovery.
+    """
+
+    def __init__(
+        self,
+        window: int = FLAP_WINDOW,
+        high_threshold: float = FLAP_HIGH_THRESHOLD,
+        low_threshold: float = FLAP_LOW_THRESHOLD,
+        recovery_checks: int = STATUS_RECOVERY_CHECKS,
+        min_samples: int = FLAP_MIN_SAMPLES,
+        min_changes: int = FLAP_MIN_CHANGES,
+    ):
+        self.window = max(2, window)
+        self.high_threshold = high_threshold
+        self.low_threshold = min(low_threshold, high_threshold)
+        self.recovery_checks = max(1, recovery_checks)
+        self.min_samples = max(2, min(min_samples, self.window))
+        self.min_changes = max(1, min_changes)
+        self._tracks: dict[uuid.UUID, _Track] = {}
+
+    def state(self, monitor_id: uuid.UUID) -> str | None:
+        track = self._tracks.get(monitor_id)
+        return track.state if track else None
+
+    def forget(self, monitor_id: uuid.UUID):
+        self._tracks.pop(monitor_id, None)
+
+    @staticmethod
+    def _changes(history: deque) -> int:
+        results = list(history)
+        return sum(1 for previous, current in zip(results, results[1:]) if previous != current)
+
+    def observe(self, monitor_id: uuid.UUID, is_up: bool, degraded: bool = False, seed: bool | None = None) -> StatusNotice | None:
+        """
+        Feeds one check verdict. `seed` is the persisted last_status, used the
+        first time a monitor is seen. Returns what to notify, if anything.
+        """
+        track = self._tracks.get(monitor_id)
+        if track is None:
+            track = _Track(state=None if seed is None else (UP if seed else DOWN), notified=seed, history=deque(maxlen=self.window))
+            self._tracks[monitor_id] = track
+
+        changed = bool(track.history) and track.history[-1] != is_up
+        track.streak = 1 if changed or not track.history else track.streak + 1
+        track.history.append(is_up)
+        changes = self._changes(track.history)
+        ratio = changes / (len(track.history) - 1) if len(track.history) > 1 else 0.0
+        settled = (DEGRADED if degraded else UP) if is_up else DOWN
+
+        if track.state == FLAPPING:
+            track.flap_changes += changed
+            if ratio > self.low_threshold and track.streak < self.min_samples:
+                return None
+            track.state = settled
+            # Only the stable tail counts toward flapping again
+            track.history = deque(list(track.history)[-track.streak:], maxlen=self.window)
+            logger.info(f"Monitor {monitor_id} stopped flapping and settled {settled}.")
+            summary = f"Stopped flapping after {track.flap_changes} status changes"
+            previous, track.notified = track.notified, is_up
+            return StatusNotice(previous, is_up, summary)
+
+        if len(track.history) >= self.min_samples and changes >= self.min_changes and ratio >= self.high_threshold:
+            track.state = FLAPPING
+            track.flap_changes = 0
+            logger.info(f"Monitor {monitor_id} is flapping ({ratio:.0%} of recent checks changed); notifications paused.")
+            return None
+
+        if is_up and track.state == DOWN and track.streak < self.recovery_checks:
+            return None  # not convinced yet
+        track.state = settled
+
+        if track.notified is None:
+            track.notified = is_up  # first verdict for a new monitor
+            return None
+        if track.notified != is_up:
+            previous, track.notified = track.notified, is_up
+            return StatusNotice(previous, is_up)
+        return None
+
+
+status_tracker = StatusTracker()
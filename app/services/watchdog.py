@@ -0,0 +1,91 @@
+import asyncio
+from app.config import SCHEDULER_STALL_SECONDS, WATCHDOG_INTERVAL_SECONDS
+from app.services.scheduler import scheduler, start_scheduler
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerWatchdog:
+    """
+    Owns the scheduler task and restarts it when it dies or stalls.
+
+    The scheduler stamps a heartbeat after every loop iteration and never sleeps
+    longer than its shard heartbeat interval, so a heartbeat older than
+    `stall_seconds` means the loop is stuck (e.g. awaiting a hung query).
+
+    A replacement is only started once the old task has actually finished, since
+    both would share the scheduler and pipeline singletons. If the old task
+    ignores cancellation, the watchdog marks itself `stuck` (reported as not
+    alive by /health) and keeps waiting for it instead.
+    """
+
+    def __init__(self, stall_seconds: int = SCHEDULER_STALL_SECONDS, interval_seconds: int = WATCHDOG_INTERVAL_SECONDS):
+        self.stall_seconds = stall_seconds
+        self.interval_seconds = interval_seconds
+        self.restarts = 0
+        self.stuck = False
+        self.scheduler_task: asyncio.Task | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def scheduler_running(self) -> bool:
+        return not self.stuck and self.scheduler_task is not None and not self.scheduler_task.done()
+
+    def start(self):
+        self.scheduler_task = asyncio.create_task(start_scheduler())
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        for task in (self._task, self.scheduler_task):
+            if task is not None:
+                task.cancel()
+        for task in (self._task, self.scheduler_task):
+            if task is not None:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                except Exception as e:
+                    logger.error(f"Scheduler task ended with an error: {e}")
+
+    async def _restart(self, reason: str):
+        logger.error(f"Restarting scheduler: {reason}")
+        self.scheduler_task.cancel()
+        done, _ = await asyncio.wait({self.scheduler_task}, timeout=10)
+        if not done:
+            self.stuck = True
+            logger.critical("Scheduler did not stop within 10s after cancellation; not starting a second one.")
+            return
+        self._replace()
+
+    def _replace(self):
+        """Starts a new scheduler task; only called once the previous one has finished."""
+        old = self.scheduler_task
+        if not old.cancelled() and old.exception() is not None:
+            logger.error(f"Scheduler task ended with an error: {old.exception()}")
+        self.stuck = False
+        self.restarts += 1
+        self.scheduler_task = asyncio.create_task(start_scheduler())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                if self.stuck:
+                    if self.scheduler_task.done():
+                        logger.warning("Stuck scheduler task finally exited; starting a new one.")
+                        self._replace()
+                    continue
+                if self.scheduler_task.done():
+                    exc = None if self.scheduler_task.cancelled() else self.scheduler_task.exception()
+                    await self._restart(f"task exited ({exc or 'no error'})")
+                    continue
+                age = scheduler.heartbeat_age()
+                if age is not None and age > self.stall_seconds:
+                    await self._restart(f"no loop iteration for {age:.0f}s")
+            except Exception as e:
+                logger.error(f"Error in scheduler watchdog: {e}")
+
+
+watchdog = SchedulerWatchdog()
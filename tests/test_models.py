@@ -0,0 +1,12 @@
+from app import models
+
+
+def test_models_import_and_declare_tables():
+    tables = models.Base.metadata.tables
+    assert {"users", "monitors", "notification_outbox", "broadcast_jobs"} <= set(tables)
+
+
+def test_broadcast_jobs_partial_index():
+    indexes = {index.name: index for index in models.BroadcastJob.__table__.indexes}
+    where = indexes["ix_broadcast_jobs_running"].dialect_options["postgresql"]["where"]
+    assert str(where) == "status = 'running'"
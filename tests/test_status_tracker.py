@@ -0,0 +1,47 @@
+import uuid
+
+from app.services.status_tracker import StatusTracker, UP, DOWN, FLAPPING
+
+
+def feed(tracker, monitor_id, results, seed=True):
+    notices, states = [], []
+    for is_up in results:
+        notices.append(tracker.observe(monitor_id, is_up, seed=seed))
+        states.append(tracker.state(monitor_id))
+    return notices, states
+
+
+def test_single_outage_after_restart_is_not_flapping():
+    tracker = StatusTracker(window=20, high_threshold=0.4, low_threshold=0.2, recovery_checks=2, min_samples=10, min_changes=3)
+    monitor_id = uuid.uuid4()
+
+    notices, states = feed(tracker, monitor_id, [True, True, True, False, True, True])
+
+    assert FLAPPING not in states
+    sent = [(n.previous_status, n.current_status) for n in notices if n is not None]
+    assert sent == [(True, False), (False, True)]
+    assert states[-1] == UP
+
+
+def test_recovery_needs_consecutive_up_results():
+    tracker = StatusTracker(recovery_checks=2, min_samples=10, min_changes=3)
+    monitor_id = uuid.uuid4()
+
+    notices, states = feed(tracker, monitor_id, [False, True])
+
+    assert notices[0] is not None and notices[1] is None
+    assert states == [DOWN, DOWN]
+
+
+def test_flapping_pauses_alerts_and_summarizes_once():
+    tracker = StatusTracker(window=20, high_threshold=0.4, low_threshold=0.2, recovery_checks=1, min_samples=6, min_changes=3)
+    monitor_id = uuid.uuid4()
+
+    notices, states = feed(tracker, monitor_id, [True, False, True, False, True, False, True])
+    assert states[-1] == FLAPPING
+
+    notices, states = feed(tracker, monitor_id, [True] * 6)
+    summaries = [n for n in notices if n is not None]
+    assert len(summaries) == 1
+    assert summaries[0].current_status is True and summaries[0].summary
+    assert states[-1] == UP